@@ -0,0 +1,279 @@
+"""
+End-to-end benchmark of the ControlLoopService
+
+Starts the `Server` with simulated controller channels (see `sila_cetoni.controllers.simulation`) in a separate
+process on localhost and measures for every combination of channel and subscriber count:
+
+- the round trip time of `WriteSetPoint` calls
+- the write-to-observe latency, i.e. the time from sending `WriteSetPoint` until the new value arrives at a
+  `SetPointValue` subscriber
+- the number of `ChannelValues` messages per second that all subscribers receive together while the values of all
+  channels are changing
+- the CPU usage, the resident memory and the number of threads of the server process
+
+The results are printed as a table and written as JSON (`--output`), so results of different releases can be compared.
+
+Usage:
+    python benchmarks/control_loop_service.py [--channels 1 10 100] [--subscribers 1 4 16] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from threading import Event, Lock
+from typing import Any, Dict, List, Tuple
+
+SERVER_ADDRESS = "127.0.0.1"
+
+
+def process_stats() -> Tuple[float, float, int]:
+    """
+    Returns the CPU time (user + system) of the current process in seconds, its resident memory in MiB and its number
+    of threads
+    """
+    times = os.times()
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak instead of current memory (in KiB on Linux, in bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return times.user + times.system, rss / 2**20, threading.active_count()
+
+
+def run_server(connection, channel_count: int, port: int, poll_interval: float, latency: float) -> None:
+    """
+    Runs the server in the child process until `"stop"` is received on `connection`, answers `"stats"` with the
+    result of `process_stats`
+    """
+    from sila_cetoni.controllers.sila.controllers_service import Server
+    from sila_cetoni.controllers.simulation import SimulatedControllerBank
+
+    # a little measurement noise keeps the values of all channels changing
+    bank = SimulatedControllerBank(channel_count, latency=latency, noise=0.01, seed=0)
+    server = Server(bank.channels, poll_interval=poll_interval)
+    server.start_insecure(SERVER_ADDRESS, port, enable_discovery=False)
+    connection.send("started")
+    try:
+        while True:
+            command = connection.recv()
+            if command == "stats":
+                connection.send(process_stats())
+            elif command == "stop":
+                break
+    finally:
+        server.stop()
+        connection.send("stopped")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Returns the mean, the 50th, 90th and 99th percentile and the maximum of `samples` (in seconds) in milliseconds
+    """
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "mean": statistics.fmean(samples) * 1000,
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": ordered[-1] * 1000,
+    }
+
+
+def measure_write_latencies(client, count: int, poll_interval: float) -> Tuple[List[float], List[float]]:
+    """
+    Returns the round trip times of `count` `WriteSetPoint` calls to channel 0 and the times until each new set point
+    has been received by a `SetPointValue` subscriber
+
+    The writes are delayed randomly by up to `poll_interval`, otherwise every write would be sent right after the poll
+    that has observed the previous one.
+    """
+    feature = client.ControlLoopService
+    metadata = [feature.ChannelIndex(0)]
+    lock = Lock()
+    expected: Dict[str, Any] = {"value": None, "event": Event()}
+
+    def on_set_point(value: float) -> None:
+        with lock:
+            if expected["value"] is not None and abs(value - expected["value"]) < 1e-6:
+                expected["received"] = time.perf_counter()
+                expected["event"].set()
+
+    subscription = feature.SetPointValue.subscribe(metadata=metadata)
+    subscription.add_callback(on_set_point)
+    round_trips, observe_latencies = [], []
+    try:
+        for i in range(count):
+            set_point = 30.0 + i % 2
+            with lock:
+                expected["value"] = set_point
+                expected["event"] = Event()
+            time.sleep(random.uniform(0, poll_interval))
+            start = time.perf_counter()
+            feature.WriteSetPoint(set_point, metadata=metadata)
+            round_trips.append(time.perf_counter() - start)
+            if expected["event"].wait(5):
+                observe_latencies.append(expected["received"] - start)
+    finally:
+        subscription.cancel()
+    return round_trips, observe_latencies
+
+
+def measure_message_rate(
+    client_class, port: int, subscriber_count: int, duration: float, server_connection
+) -> Tuple[float, float, int]:
+    """
+    Subscribes `subscriber_count` clients to `ChannelValues` for `duration` seconds
+
+    Returns
+    -------
+    Tuple[float, float, int]
+        The number of messages per second all subscribers received together, the actual measurement time and the
+        number of threads of the server process while all clients were subscribed
+    """
+    clients = [client_class(SERVER_ADDRESS, port, insecure=True) for _ in range(subscriber_count)]
+    counts = [0] * subscriber_count
+    subscriptions = []
+
+    def counter(i: int):
+        def on_channel_values(_) -> None:
+            counts[i] += 1
+
+        return on_channel_values
+
+    for i, client in enumerate(clients):
+        subscription = client.ControlLoopService.ChannelValues.subscribe()
+        subscription.add_callback(counter(i))
+        subscriptions.append(subscription)
+    # let all subscriptions get established before counting
+    time.sleep(1)
+    start_counts, start = sum(counts), time.perf_counter()
+    time.sleep(duration)
+    messages, elapsed = sum(counts) - start_counts, time.perf_counter() - start
+    server_connection.send("stats")
+    _, _, threads = server_connection.recv()
+    for subscription in subscriptions:
+        subscription.cancel()
+    return messages / elapsed, elapsed, threads
+
+
+def run_benchmark(channel_count: int, subscriber_count: int, port: int, args: argparse.Namespace) -> Dict[str, Any]:
+    from sila_cetoni.controllers.sila.controllers_service import Client
+
+    context = multiprocessing.get_context("spawn")
+    parent_connection, child_connection = context.Pipe()
+    server_process = context.Process(
+        target=run_server,
+        args=(child_connection, channel_count, port, args.poll_interval, args.channel_latency),
+        daemon=True,
+    )
+    server_process.start()
+    try:
+        if not parent_connection.poll(60) or parent_connection.recv() != "started":
+            raise RuntimeError("The server did not start")
+        client = Client(SERVER_ADDRESS, port, insecure=True)
+        # all control loops run towards a new set point, so the values change in every poll
+        client.ControlLoopService.WriteSetPoints([(i, 40.0) for i in range(channel_count)])
+        for i in range(channel_count):
+            client.ControlLoopService.RunControlLoop(metadata=[client.ControlLoopService.ChannelIndex(i)])
+
+        round_trips, observe_latencies = measure_write_latencies(client, args.writes, args.poll_interval)
+
+        parent_connection.send("stats")
+        cpu_before, _, _ = parent_connection.recv()
+        message_rate, elapsed, threads = measure_message_rate(
+            Client, port, subscriber_count, args.duration, parent_connection
+        )
+        parent_connection.send("stats")
+        cpu_after, rss, _ = parent_connection.recv()
+
+        return {
+            "channels": channel_count,
+            "subscribers": subscriber_count,
+            "write_round_trip_ms": percentiles(round_trips),
+            "write_to_observe_ms": percentiles(observe_latencies),
+            "missed_observations": len(round_trips) - len(observe_latencies),
+            "channel_values_messages_per_second": message_rate,
+            "expected_messages_per_second": subscriber_count / args.poll_interval,
+            "server_cpu_percent": (cpu_after - cpu_before) / elapsed * 100,
+            "server_rss_mib": rss,
+            "server_threads": threads,
+        }
+    finally:
+        parent_connection.send("stop")
+        parent_connection.poll(30)
+        server_process.join(30)
+        if server_process.is_alive():
+            server_process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 10, 100], help="numbers of channels")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 4, 16], help="numbers of subscribers")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="poll interval of the server in s")
+    parser.add_argument("--channel-latency", type=float, default=0, help="time each channel call takes in s")
+    parser.add_argument("--writes", type=int, default=100, help="number of WriteSetPoint calls per run")
+    parser.add_argument("--duration", type=float, default=5, help="duration of the message rate measurement in s")
+    parser.add_argument("--port", type=int, default=50200, help="first port to use for the servers")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    args = parser.parse_args()
+
+    from sila_cetoni.controllers import __version__
+
+    results = []
+    print(
+        f"{'channels':>8} {'subscr.':>7} {'write p50/p99 [ms]':>19} {'observe p50/p99 [ms]':>21} "
+        f"{'msgs/s':>8} {'CPU [%]':>8} {'RSS [MiB]':>9} {'threads':>7}"
+    )
+    port = args.port
+    for channel_count in args.channels:
+        for subscriber_count in args.subscribers:
+            result = run_benchmark(channel_count, subscriber_count, port, args)
+            port += 1
+            results.append(result)
+            write, observe = result["write_round_trip_ms"], result["write_to_observe_ms"]
+            print(
+                f"{channel_count:>8} {subscriber_count:>7} {write['p50']:>9.2f}/{write['p99']:<9.2f} "
+                f"{observe.get('p50', float('nan')):>10.2f}/{observe.get('p99', float('nan')):<10.2f} "
+                f"{result['channel_values_messages_per_second']:>8.1f} {result['server_cpu_percent']:>8.1f} "
+                f"{result['server_rss_mib']:>9.1f} {result['server_threads']:>7}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "parameters": vars(args),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
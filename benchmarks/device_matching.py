@@ -0,0 +1,128 @@
+"""
+Benchmark for the assignment of controller channels to devices in `create_devices_cetoni`
+
+Generates synthetic device and channel names, assigns the channels with the previous O(channels x devices)
+implementation and with the indexed one and checks that both produce the same assignment.
+
+Usage:
+    python benchmarks/device_matching.py [--devices 100 1000 5000] [--channels-per-device 4] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from sila_cetoni.controllers import CetoniControllerDevice, _assign_channels_to_devices
+
+
+class SyntheticChannel:
+    def __init__(self, name: str) -> None:
+        self.__name = name
+
+    def get_name(self) -> str:
+        return self.__name
+
+
+class SyntheticDevice:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.controller_channels: List[SyntheticChannel] = []
+
+
+def legacy_assign_channels_to_devices(
+    channels: List[SyntheticChannel], config_devices: List[SyntheticDevice]
+) -> List[CetoniControllerDevice]:
+    """
+    The assignment logic of `create_devices_cetoni` before the device names were indexed
+    """
+    devices: List[CetoniControllerDevice] = []
+    for channel in channels:
+        channel_name = channel.get_name()
+        for device in devices + config_devices:
+            if device.name.rsplit("_Pump", 1)[0] in channel_name:
+                device.controller_channels.append(channel)
+                break
+        else:
+            device_name = re.match(
+                r".*(?=(_Temperature)|(_ReactionLoop)|(_ReactorZone)|(_Ctrl)\d?$)", channel_name
+            ).group()
+            device = CetoniControllerDevice(device_name)
+            device.controller_channels.append(channel)
+            devices.append(device)
+    return devices
+
+
+def make_configuration(device_count: int, channels_per_device: int) -> Tuple[List[str], List[str]]:
+    """
+    Returns the names of `device_count` configured devices and of their channels plus the channels of as many
+    standalone controllers
+
+    Every tenth name is not zero-padded, so some names are contained in others (e.g. `Device1` in `Device10`) and the
+    precedence rules are exercised, too.
+    """
+
+    def number(i: int) -> str:
+        return str(i) if i % 10 == 0 else f"{i:06d}"
+
+    device_names = [f"Device{number(i)}_Pump" if i % 2 else f"Device{number(i)}" for i in range(device_count)]
+    channel_suffixes = ["_Temperature", "_ReactionLoop", "_ReactorZone", "_Ctrl"]
+    channel_names = []
+    for i in range(device_count):
+        for k in range(channels_per_device):
+            channel_names.append(f"Device{number(i)}_Ctrl{k}")
+            channel_names.append(f"Reactor{number(i)}{channel_suffixes[k % len(channel_suffixes)]}")
+    return device_names, channel_names
+
+
+def run(
+    assign: Callable, device_names: List[str], channel_names: List[str]
+) -> Tuple[float, Dict[str, List[str]], List[str]]:
+    """
+    Returns the duration of `assign`, the channel names per device name and the names of the standalone devices
+    """
+    config_devices = [SyntheticDevice(name) for name in device_names]
+    channels = [SyntheticChannel(name) for name in channel_names]
+    start = time.perf_counter()
+    standalone_devices = assign(channels, config_devices)
+    duration = time.perf_counter() - start
+    assignment = {
+        device.name: [channel.get_name() for channel in device.controller_channels]
+        for device in standalone_devices + config_devices
+    }
+    return duration, assignment, [device.name for device in standalone_devices]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=[100, 1000, 5000], help="numbers of devices")
+    parser.add_argument("--channels-per-device", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3, help="the best of REPEAT runs is reported")
+    args = parser.parse_args()
+
+    print(f"{'devices':>8} {'channels':>9} {'legacy [ms]':>12} {'indexed [ms]':>13} {'speedup':>8}")
+    for device_count in args.devices:
+        device_names, channel_names = make_configuration(device_count, args.channels_per_device)
+        legacy_durations, indexed_durations = [], []
+        for _ in range(args.repeat):
+            legacy_duration, legacy_assignment, legacy_standalone = run(
+                legacy_assign_channels_to_devices, device_names, channel_names
+            )
+            indexed_duration, indexed_assignment, indexed_standalone = run(
+                _assign_channels_to_devices, device_names, channel_names
+            )
+            if legacy_assignment != indexed_assignment or legacy_standalone != indexed_standalone:
+                raise SystemExit(f"The assignments differ for {device_count} devices")
+            legacy_durations.append(legacy_duration)
+            indexed_durations.append(indexed_duration)
+        legacy, indexed = min(legacy_durations), min(indexed_durations)
+        print(
+            f"{device_count:>8} {len(channel_names):>9} {legacy * 1000:>12.1f} {indexed * 1000:>13.1f} "
+            f"{legacy / indexed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Checks the time it takes to import `sila_cetoni.controllers` against a budget
+
+Imports the package in fresh interpreters with `python -X importtime`, reports the best cumulative import time and the
+slowest imported modules, and exits with status 1 if the import takes longer than the budget or if it loads any of the
+modules that should only be imported on first use (qmixsdk, sila2, grpc).
+
+This is a manual check, it is not run by the CI: run it before a release or after changing imports of the package
+(the package needs to be importable, i.e. installed together with the core `sila_cetoni` package).
+
+Usage:
+    python benchmarks/import_time.py [--budget 100] [--repeat 5] [--module sila_cetoni.controllers]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFERRED_MODULES = ["qmixsdk", "sila2", "grpc"]
+
+
+def measure(module: str) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """
+    Imports `module` in a fresh interpreter
+
+    Returns
+    -------
+    Tuple[Dict[str, Tuple[int, int]], List[str]]
+        The `(self, cumulative)` import time in microseconds per imported module and the deferred modules that have
+        been imported
+    """
+    check = f"import sys; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}; {check}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return times, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="sila_cetoni.controllers", help="the module to import")
+    parser.add_argument("--budget", type=float, default=100, help="the maximum import time in ms (default: 100)")
+    parser.add_argument("--repeat", type=int, default=5, help="the best of REPEAT imports is reported")
+    parser.add_argument("--top", type=int, default=10, help="the number of slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    times, loaded = min(runs, key=lambda run: run[0][args.module][1])
+    total_ms = times[args.module][1] / 1000
+
+    print(f"Slowest modules imported by {args.module} (self / cumulative in ms):")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: item[1][0], reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {name}")
+    print(f"Importing {args.module} took {total_ms:.1f} ms (budget: {args.budget:.1f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAILED: {', '.join(loaded)} should only be imported on first use")
+        failed = True
+    if total_ms > args.budget:
+        print("FAILED: import time exceeds the budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
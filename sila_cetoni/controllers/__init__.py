@@ -1,26 +1,34 @@
 from __future__ import annotations
 
+import bisect
 import logging
 import re
-from typing import TYPE_CHECKING, Dict, Generic, List, Optional, TypeVar, Union, overload
-
-from qmixsdk import qmixcontroller
+import time
+from typing import TYPE_CHECKING, Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union, overload
 
 from sila_cetoni.application.device import CetoniDevice, Device
 from sila_cetoni.utils import get_version
 
-from .sila.controllers_service.server import Server
+from .channel_discovery import ChannelHandle, LazyControllerChannel, discover_controller_channels
+from .channel_table import ChannelTable
 
 if TYPE_CHECKING:
+    from qmixsdk import qmixcontroller
+
     from sila_cetoni.application.application_configuration import ApplicationConfiguration
     from sila_cetoni.application.cetoni_device_configuration import CetoniDeviceConfiguration
 
+    from .sila.controllers_service.server import Server
+
 __version__ = get_version(__name__)
 
 logger = logging.getLogger(__name__)
 
 _T = TypeVar("_T")
 
+# the name of a standalone controller device is the name of its channels without the channel suffix
+_STANDALONE_DEVICE_NAME_PATTERN = re.compile(r".*(?=(_Temperature)|(_ReactionLoop)|(_ReactorZone)|(_Ctrl)\d?$)")
+
 
 # currently only a placeholder until we support controller devices from other manufacturers, as well
 class ControllerDevice(Device, Generic[_T]):
@@ -53,7 +61,7 @@ class ControllerDevice(Device, Generic[_T]):
 
 
 # `CetoniControllerDevice` *is* a `ControllerDevice`, as well, via duck typing
-class CetoniControllerDevice(CetoniDevice[qmixcontroller.ControllerChannel]):
+class CetoniControllerDevice(CetoniDevice["qmixcontroller.ControllerChannel"]):
     """
     Simple class to represent a controller device that has an arbitrary number of controller channels
     (inherited from the `CetoniDevice` class)
@@ -100,7 +108,9 @@ def create_devices(config: ApplicationConfiguration, scan: bool = False) -> None
 
 
 @overload
-def create_devices(config: CetoniDeviceConfiguration) -> List[CetoniControllerDevice]:
+def create_devices(
+    config: CetoniDeviceConfiguration, discovery_workers: int = 1, lazy_channels: bool = False
+) -> List[CetoniControllerDevice]:
     """
     Looks up all CETONI devices from the given configuration `config` and creates the necessary `CetoniControllerDevice`s for them
 
@@ -108,6 +118,11 @@ def create_devices(config: CetoniDeviceConfiguration) -> List[CetoniControllerDe
     ----------
     config: CetoniDeviceConfiguration
         The CETONI device configuration
+    discovery_workers: int (default: 1)
+        The maximum number of controller channels that are looked up concurrently
+    lazy_channels: bool (default: False)
+        Whether to wrap each controller channel in a `LazyControllerChannel` that knows its index (needed by
+        `create_supervisor`)
 
     Returns
     -------
@@ -128,54 +143,146 @@ def create_devices(config: Union[ApplicationConfiguration, CetoniDeviceConfigura
         )
         return
     if isinstance(config, CetoniDeviceConfiguration):
-        return create_devices_cetoni(config)
+        return create_devices_cetoni(config, *args, **kwargs)
     raise ValueError(
         f"Parameter 'config' must be of type 'ApplicationConfiguration' or 'CetoniDeviceConfiguration', not"
         f"{type(config)!r}!"
     )
 
 
-def create_devices_cetoni(config: CetoniDeviceConfiguration) -> List[CetoniControllerDevice]:
+def create_devices_cetoni(
+    config: CetoniDeviceConfiguration, discovery_workers: int = 1, lazy_channels: bool = False
+) -> List[CetoniControllerDevice]:
     """
     Implementation of `create_devices` for devices from the CETONI device config
 
     See `create_devices` for an explanation of the parameters and return value
     """
 
-    channel_count = qmixcontroller.ControllerChannel.get_no_of_channels()
-    logger.debug(f"Number of controller channels: {channel_count}")
+    channels = discover_controller_channels(discovery_workers, lazy_channels)
+
+    # Using `config.devices` here and operating directly on these devices is somewhat contradictory to the decoupling
+    # between sila_cetoni.application and the add-on packages that this method should achieve. However, this seems to
+    # be the only viable way for now.
+    start = time.perf_counter()
+    devices = _assign_channels_to_devices(channels, config.devices)
+    logger.info(
+        f"Assigned {len(channels)} controller channel(s) to devices in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return devices
 
-    channels: List[qmixcontroller.ControllerChannel] = []
-    for i in range(channel_count):
-        channel = qmixcontroller.ControllerChannel()
-        channel.lookup_channel_by_index(i)
-        logger.debug(f"Found controller channel {i} named {channel.get_name()}")
-        channels.append(channel)
+
+class _DeviceNameIndex:
+    """
+    Finds the device that a controller channel belongs to by the name of the channel
+
+    A channel belongs to the device with the lowest order whose name (without a `"_Pump"` suffix) is contained in the
+    name of the channel. For a few devices (the usual case) the names are simply tested in the order of the devices.
+    Once there are `TRIE_MIN_NAMES` names, they are also kept in a character trie, so a lookup only walks along the
+    channel name from each position as long as there is a device name that continues with the next character,
+    independent of the number of devices (see `benchmarks/device_matching.py`, the trie is faster from about 400
+    devices on and slower below that).
+    """
+
+    TRIE_MIN_NAMES = 400
+
+    __entries: List[Tuple[Tuple[int, int], str, Device]]  # `(order, name, device)` ordered by `order`
+    __root: Optional[Dict[str, Any]]  # character -> child node, `""` -> `(order, device)` of the name ending here
+
+    def __init__(self) -> None:
+        self.__entries = []
+        self.__root = None
+
+    def add(self, device: Device, order: Tuple[int, int]) -> None:
+        """
+        Adds `device` to the index, if there is a device with the same name already, the one with the lower `order`
+        is found
+        """
+        name = device.name.rsplit("_Pump", 1)[0]
+        # the orders are unique, so the devices themselves are never compared
+        bisect.insort(self.__entries, (order, name, device))
+        if self.__root is not None:
+            self.__add_to_trie(name, device, order)
+        elif len(self.__entries) >= self.TRIE_MIN_NAMES:
+            self.__root = {}
+            for entry_order, entry_name, entry_device in self.__entries:
+                self.__add_to_trie(entry_name, entry_device, entry_order)
+
+    def find(self, channel_name: str) -> Optional[Device]:
+        if self.__root is None:
+            for _, name, device in self.__entries:
+                if name in channel_name:
+                    return device
+            return None
+
+        root = self.__root
+        best: Optional[Tuple[Tuple[int, int], Device]] = root.get("")
+        for start, first_char in enumerate(channel_name):
+            node = root.get(first_char)
+            end = start + 1
+            while node is not None:
+                entry = node.get("")
+                if entry is not None and (best is None or entry[0] < best[0]):
+                    best = entry
+                if end == len(channel_name):
+                    break
+                node = node.get(channel_name[end])
+                end += 1
+        return None if best is None else best[1]
+
+    def __add_to_trie(self, name: str, device: Device, order: Tuple[int, int]) -> None:
+        node = self.__root
+        for char in name:
+            node = node.setdefault(char, {})
+        if "" not in node or order < node[""][0]:
+            node[""] = (order, device)
+
+
+def _assign_channels_to_devices(
+    channels: List[ChannelHandle], config_devices: List[Device]
+) -> List[CetoniControllerDevice]:
+    """
+    Adds each of the given `channels` to the device it belongs to and creates standalone controller devices for the
+    channels that don't belong to any device
+
+    Standalone devices take precedence over the devices from `config_devices` and earlier devices take precedence over
+    later ones.
+
+    Returns
+    -------
+    List[CetoniControllerDevice]
+        The newly created standalone controller devices
+    """
+    index = _DeviceNameIndex()
+    for i, device in enumerate(config_devices):
+        index.add(device, (1, i))
 
     devices: List[CetoniControllerDevice] = []
     for channel in channels:
         channel_name = channel.get_name()
-        # Using `config.devices` here and operating directly on these devices is somewhat contradictory to the
-        # decoupling between sila_cetoni.application and the add-on packages that this method should achieve. However,
-        # this seems to be the only viable way for now.
-        for device in devices + config.devices:
-            if device.name.rsplit("_Pump", 1)[0] in channel_name:
-                logger.debug(f"Channel {channel_name} belongs to device {device}")
-                device.controller_channels.append(channel)
-                break
-        else:
-            device_name = re.match(
-                r".*(?=(_Temperature)|(_ReactionLoop)|(_ReactorZone)|(_Ctrl)\d?$)", channel_name
-            ).group()
+        device = index.find(channel_name)
+        if device is None:
+            device_name = _STANDALONE_DEVICE_NAME_PATTERN.match(channel_name).group()
             logger.debug(f"Standalone controller device {device_name}")
             device = CetoniControllerDevice(device_name)
-            logger.debug(f"Channel {channel_name} belongs to device {device}")
-            device.controller_channels.append(channel)
+            index.add(device, (0, len(devices)))
             devices.append(device)
+        logger.debug(f"Channel {channel_name} belongs to device {device}")
+        device.controller_channels.append(channel)
 
     return devices
 
 
+def __getattr__(name: str) -> Any:
+    # `Server` pulls in sila2 and the generated feature code, so it is only imported on first use (e.g. tools that only
+    # need `parse_devices` or `ControllerDevice` don't have to pay for it)
+    if name == "Server":
+        from .sila.controllers_service.server import Server
+
+        return Server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def create_server(device: ControllerDevice, **server_args) -> Server:
     """
     Creates the SiLA Server for the given `device`
@@ -187,5 +294,31 @@ def create_server(device: ControllerDevice, **server_args) -> Server:
     **server_args
         Additional arguments like server name, server UUID to pass to the server's `__init__` function
     """
+    from .sila.controllers_service.server import Server
+
     logger.info(f"Creating server for {device}")
     return Server(controller_channels=device.controller_channels, **server_args)
+
+
+def create_consolidated_server(devices: List[ControllerDevice], **server_args) -> Server:
+    """
+    Creates a single SiLA Server that hosts the controller channels of all given `devices` instead of one server per
+    device (see `create_server`)
+
+    The channels are numbered consecutively in the order of the devices, i.e. the `ChannelIndex` of a channel is its
+    index in `ChannelTable.from_devices(devices).channels`. The `ChannelNames` property of the server returns the
+    qualified name (`"Device/Channel"`) of each channel, so clients can look up the index of a channel with
+    `ChannelTable.from_names`.
+
+    Parameters
+    ----------
+    devices: List[ControllerDevice]
+        The devices whose channels the server should host
+    **server_args
+        Additional arguments like server name, server UUID to pass to the server's `__init__` function
+    """
+    from .sila.controllers_service.server import Server
+
+    table = ChannelTable.from_devices(devices)
+    logger.info(f"Creating a consolidated server for {len(table)} channel(s) of {len(table.device_names)} device(s)")
+    return Server(controller_channels=table.channels, channel_names=table.names, **server_args)
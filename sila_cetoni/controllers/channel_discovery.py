@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from qmixsdk import qmixcontroller
+
+logger = logging.getLogger(__name__)
+
+
+class LazyControllerChannel:
+    """
+    Stands in for a `qmixcontroller.ControllerChannel` that is identified by its index and name
+
+    The name of the channel is known from the discovery, so `get_name` does not need a handle. Every other attribute
+    access is forwarded to the `ControllerChannel`, which is either the one that the discovery has already looked up or
+    is created and looked up by its index on first use (e.g. in a worker process that has only got the index and the
+    name of the channel, see `lazy_controller_channels`).
+    """
+
+    __index: int
+    __name: str
+    __channel: Optional[qmixcontroller.ControllerChannel]
+    __lock: Lock
+
+    def __init__(self, index: int, name: str, channel: Optional[qmixcontroller.ControllerChannel] = None) -> None:
+        self.__index = index
+        self.__name = name
+        self.__channel = channel
+        self.__lock = Lock()
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def is_looked_up(self) -> bool:
+        return self.__channel is not None
+
+    def get_name(self) -> str:
+        return self.__name
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes that are not defined on this class
+        if name.startswith(f"_{LazyControllerChannel.__name__}__"):
+            # not initialized yet (e.g. while copying)
+            raise AttributeError(name)
+        if self.__channel is None:
+            with self.__lock:
+                if self.__channel is None:
+                    self.__channel = _lookup_channel(self.__index)
+                    logger.debug(f"Looked up controller channel {self.__index} ({self.__name}) on first use")
+        return getattr(self.__channel, name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__index}, {self.__name!r})"
+
+
+ChannelHandle = Union["qmixcontroller.ControllerChannel", LazyControllerChannel]
+
+
+def _lookup_channel(index: int) -> qmixcontroller.ControllerChannel:
+    from qmixsdk import qmixcontroller
+
+    channel = qmixcontroller.ControllerChannel()
+    channel.lookup_channel_by_index(index)
+    return channel
+
+
+def _discover_channel(index: int, lazy: bool) -> ChannelHandle:
+    channel = _lookup_channel(index)
+    name = channel.get_name()
+    logger.debug(f"Found controller channel {index} named {name}")
+    # the handle that was needed to get the name is kept, so the channel is never looked up twice
+    return LazyControllerChannel(index, name, channel) if lazy else channel
+
+
+def discover_controller_channels(max_workers: int = 1, lazy: bool = False) -> List[ChannelHandle]:
+    """
+    Looks up all controller channels and their names
+
+    Parameters
+    ----------
+    max_workers: int (default: 1)
+        The maximum number of threads that look up channels concurrently, `1` looks up one channel after another
+    lazy: bool (default: False)
+        Whether to return `LazyControllerChannel`s that know the index of each channel (e.g. to pass the channels to
+        the worker processes of a `ControllerSupervisor`), they use the `ControllerChannel` that has been looked up
+        here
+
+    Returns
+    -------
+    List[ChannelHandle]
+        All controller channels ordered by their index
+    """
+    from qmixsdk import qmixcontroller
+
+    start = time.perf_counter()
+    channel_count = qmixcontroller.ControllerChannel.get_no_of_channels()
+    counted = time.perf_counter()
+    logger.debug(f"Number of controller channels: {channel_count}")
+
+    if max_workers > 1 and channel_count > 1:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, channel_count), thread_name_prefix="ControllerChannelDiscovery"
+        ) as executor:
+            channels = list(executor.map(_discover_channel, range(channel_count), [lazy] * channel_count))
+    else:
+        channels = [_discover_channel(i, lazy) for i in range(channel_count)]
+    discovered = time.perf_counter()
+
+    logger.info(
+        f"Discovered {channel_count} controller channel(s) in {(discovered - start) * 1000:.1f} ms (counting: "
+        f"{(counted - start) * 1000:.1f} ms, lookup and names: "
+        f"{(discovered - counted) * 1000:.1f} ms with {max(1, min(max_workers, channel_count))} worker(s))"
+    )
+    return channels
+
+
+def lazy_controller_channels(channels: Sequence[Tuple[int, str]]) -> List[LazyControllerChannel]:
+    """
+    Creates a `LazyControllerChannel` for each `(index, name)` of a channel that has been discovered before (e.g. in
+    another process, see `ControllerSupervisor`), so the handles are only looked up by the process that uses them
+    """
+    return [LazyControllerChannel(index, name) for index, name in channels]
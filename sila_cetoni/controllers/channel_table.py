@@ -0,0 +1,151 @@
+"""
+Addressing the controller channels of several devices that are hosted by a single (consolidated) server
+
+A consolidated server numbers the channels of all devices consecutively, i.e. the `ChannelIndex` of a channel is its
+index in the list of all channels. The `ChannelTable` maps a device-qualified address (the device name and the name or
+the device-local index of the channel) to that global index with a precomputed dictionary lookup. Clients can build the
+same table from the `ChannelNames` property of the server (see `ChannelTable.from_names`).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from . import ControllerDevice
+
+SEPARATOR = "/"
+"""Separates the device name from the channel name in a qualified channel name"""
+
+
+class ChannelTable:
+    """
+    The controller channels of several devices with their global channel indices
+    """
+
+    __names: List[str]  # qualified channel names in the order of the global indices
+    __channels: List[Any]  # same number of items and order as `__names` (or empty)
+    __device_ranges: Dict[str, range]  # device name -> global indices of the device's channels
+    __by_channel_name: Dict[Tuple[str, str], int]  # (device name, channel name) -> global index
+    __by_qualified_name: Dict[str, int]  # qualified channel name -> global index
+
+    def __init__(self, devices: Iterable[Tuple[str, Sequence[str]]], channels: Optional[Sequence[Any]] = None) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        devices: Iterable[Tuple[str, Sequence[str]]]
+            The name of every device and the names of its channels, the channels are numbered in this order
+        channels: Sequence (optional)
+            The channels in the same order
+        """
+        self.__names = []
+        self.__device_ranges = {}
+        self.__by_channel_name = {}
+        self.__by_qualified_name = {}
+        for device_name, channel_names in devices:
+            if device_name in self.__device_ranges:
+                raise ValueError(f"Duplicate device name {device_name!r}")
+            if SEPARATOR in device_name:
+                raise ValueError(f"The device name {device_name!r} must not contain {SEPARATOR!r}")
+            start = len(self.__names)
+            for channel_name in channel_names:
+                index = len(self.__names)
+                qualified_name = f"{device_name}{SEPARATOR}{channel_name}"
+                self.__names.append(qualified_name)
+                # the first channel wins if a device has several channels with the same name
+                self.__by_channel_name.setdefault((device_name, channel_name), index)
+                self.__by_qualified_name.setdefault(qualified_name, index)
+            self.__device_ranges[device_name] = range(start, len(self.__names))
+
+        self.__channels = list(channels) if channels is not None else []
+        if self.__channels and len(self.__channels) != len(self.__names):
+            raise ValueError(f"Got {len(self.__channels)} channels for {len(self.__names)} channel names")
+
+    @classmethod
+    def from_devices(cls, devices: Iterable[ControllerDevice]) -> ChannelTable:
+        """
+        Creates the table for the controller channels of all given `devices`
+        """
+        devices = list(devices)
+        return cls(
+            ((device.name, [channel.get_name() for channel in device.controller_channels]) for device in devices),
+            [channel for device in devices for channel in device.controller_channels],
+        )
+
+    @classmethod
+    def from_names(cls, qualified_names: Iterable[str]) -> ChannelTable:
+        """
+        Creates the table from the qualified channel names in the order of their global indices (e.g. the value of
+        the `ChannelNames` property of a consolidated server)
+        """
+        devices: Dict[str, List[str]] = {}
+        previous_device: Optional[str] = None
+        for qualified_name in qualified_names:
+            device_name, _, channel_name = qualified_name.partition(SEPARATOR)
+            if device_name != previous_device and device_name in devices:
+                raise ValueError(f"The channels of device {device_name!r} are not consecutive")
+            devices.setdefault(device_name, []).append(channel_name)
+            previous_device = device_name
+        return cls(devices.items())
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @property
+    def names(self) -> List[str]:
+        """
+        The qualified names (`"Device/Channel"`) of all channels in the order of their global indices
+        """
+        return self.__names
+
+    @property
+    def channels(self) -> List[Any]:
+        """
+        All channels in the order of their global indices (empty if the table has been created from names only)
+        """
+        return self.__channels
+
+    @property
+    def device_names(self) -> List[str]:
+        return list(self.__device_ranges)
+
+    def device_channel_indices(self, device_name: str) -> range:
+        """
+        The global indices of all channels of the device with the given name
+        """
+        try:
+            return self.__device_ranges[device_name]
+        except KeyError:
+            raise KeyError(f"Unknown device {device_name!r}") from None
+
+    def index(self, device_name: str, channel: Union[int, str]) -> int:
+        """
+        Returns the global index of a channel of the device with the given name
+
+        Parameters
+        ----------
+        device_name: str
+            The name of the device
+        channel: int | str
+            The name of the channel or its index among the channels of the device
+        """
+        if isinstance(channel, str):
+            try:
+                return self.__by_channel_name[(device_name, channel)]
+            except KeyError:
+                raise KeyError(f"Device {device_name!r} has no channel {channel!r}") from None
+        channel_indices = self.device_channel_indices(device_name)
+        if not 0 <= channel < len(channel_indices):
+            raise KeyError(f"Device {device_name!r} has no channel with index {channel}")
+        return channel_indices[channel]
+
+    def index_of(self, qualified_name: str) -> int:
+        """
+        Returns the global index of the channel with the given qualified name (`"Device/Channel"`)
+        """
+        try:
+            return self.__by_qualified_name[qualified_name]
+        except KeyError:
+            raise KeyError(f"Unknown channel {qualified_name!r}") from None
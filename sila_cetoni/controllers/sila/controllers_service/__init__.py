@@ -1,7 +1,25 @@
-from .generated import Client
-from .server import Server
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .generated import Client
+    from .server import Server
 
 __all__ = [
     "Client",
     "Server",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # `Client` and `Server` pull in sila2 and the generated feature code, so they are only imported on first use
+    if name == "Client":
+        from .generated import Client
+
+        return Client
+    if name == "Server":
+        from .server import Server
+
+        return Server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
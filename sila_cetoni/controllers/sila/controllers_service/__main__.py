@@ -1,5 +1,9 @@
 import logging
+import sys
+import threading
 from argparse import ArgumentParser
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
 from .server import Server
 
@@ -12,6 +16,99 @@ def parse_args():
     parser.add_argument("-p", "--port", type=int, default=50052, help="The port (default: 50052)")
     parser.add_argument("--disable-discovery", action="store_true", help="Disable SiLA Server Discovery")
 
+    channels_group = parser.add_argument_group(
+        "controller channels (one of --simulate and --device-config is required)"
+    )
+    channels_exclusive_group = channels_group.add_mutually_exclusive_group(required=True)
+    channels_exclusive_group.add_argument(
+        "--simulate", type=int, default=0, metavar="N", help="Serve N simulated controller channels"
+    )
+    channels_exclusive_group.add_argument(
+        "--device-config",
+        metavar="PATH",
+        help="Open the device bus with the given CETONI device configuration and serve all controller channels of it",
+    )
+    channels_group.add_argument(
+        "--simulation-latency",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="The time every call of a simulated channel takes (default: 0)",
+    )
+    channels_group.add_argument(
+        "--discovery-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="The number of threads that look up the channels of the device bus concurrently (default: 1)",
+    )
+
+    tuning_group = parser.add_argument_group("performance tuning")
+    tuning_group.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.1,
+        metavar="SECONDS",
+        help="The interval in which the channels are polled (default: 0.1)",
+    )
+    tuning_group.add_argument(
+        "--idle-poll-interval",
+        type=float,
+        metavar="SECONDS",
+        help="The longest interval in which idle channels are polled (default: the poll interval, i.e. no adaptive "
+        "polling)",
+    )
+    tuning_group.add_argument(
+        "--grpc-workers",
+        type=int,
+        default=100,
+        metavar="N",
+        help="The maximum number of threads that handle gRPC calls (default: 100)",
+    )
+    tuning_group.add_argument(
+        "--subscription-buffer-size",
+        type=int,
+        default=10,
+        metavar="N",
+        help="The number of values of an observable property that are buffered for each slow subscriber (default: 10)",
+    )
+    tuning_group.add_argument(
+        "--history-capacity",
+        type=int,
+        default=36000,
+        metavar="N",
+        help="The number of samples that are kept in the history of each channel, 0 disables the history "
+        "(default: 36000)",
+    )
+    tuning_group.add_argument(
+        "--min-set-point-interval",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="The shortest interval between two set point writes to a channel (default: 0)",
+    )
+    tuning_group.add_argument(
+        "--set-point-reconcile-interval",
+        type=float,
+        metavar="SECONDS",
+        help="Cache the set points and only read them from the channels in this interval (default: read them in every "
+        "poll)",
+    )
+
+    output_group = parser.add_argument_group("metrics and profiling")
+    output_group.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve the metrics of the server in the Prometheus text format on http://<ip-address>:PORT/metrics",
+    )
+    output_group.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Profile all threads of the server with cProfile and write the statistics to PATH when the server stops "
+        "(e.g. to view them with `python -m pstats PATH`)",
+    )
+
     log_level_group = parser.add_mutually_exclusive_group()
     log_level_group.add_argument("-q", "--quiet", action="store_true", help="Only log errors")
     log_level_group.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
@@ -20,20 +117,114 @@ def parse_args():
     return parser.parse_args()
 
 
-def start_server(args):
-    server = Server()
+@contextmanager
+def open_device_bus(device_config: str) -> Iterator[None]:
+    """
+    Opens and starts the device bus with the given device configuration for the duration of the `with` block
+    """
+    from qmixsdk import qmixbus
 
+    bus = qmixbus.Bus()
+    bus.open(device_config, "")
+    bus.start()
     try:
-        server.start_insecure(args.ip_address, args.port, enable_discovery=not args.disable_discovery)
-        print(f"Server startup complete, running on {args.ip_address}:{args.port}. Press Enter to stop it")
+        yield
+    finally:
+        bus.stop()
+        bus.close()
 
-        try:
-            input()
-        except KeyboardInterrupt:
-            pass
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """
+    Profiles the current thread and all threads that are started in the `with` block (if `path` is given) and writes
+    the combined statistics to `path`
+    """
+    if path is None:
+        yield
+        return
+
+    import cProfile
+    import pstats
+
+    main_profile = cProfile.Profile()
+    profiles: List[cProfile.Profile] = [main_profile]
+
+    # since Python 3.12 cProfile uses `sys.monitoring` which only allows one active profiler that already sees all
+    # threads, before that a profiler only sees the thread that has enabled it, so every new thread needs its own
+    per_thread = sys.version_info < (3, 12)
+    if per_thread:
+
+        def profile_thread(*args) -> None:
+            # called for the first event of every new thread, replaces itself with a profiler for that thread
+            profile = cProfile.Profile()
+            profiles.append(profile)
+            profile.enable()
+
+        threading.setprofile(profile_thread)
+    main_profile.enable()
+    try:
+        yield
     finally:
-        server.stop()
-        print("Stopped server")
+        main_profile.disable()
+        if per_thread:
+            threading.setprofile(None)
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(path)
+        threads = f"{len(profiles)} thread(s)" if per_thread else "all threads"
+        print(f"Wrote the profile of {threads} to {path}")
+
+
+def start_server(args):
+    if args.device_config is not None:
+        from ...channel_discovery import discover_controller_channels
+
+        with open_device_bus(args.device_config):
+            run_server(args, discover_controller_channels(args.discovery_workers))
+    else:
+        from ...simulation import SimulatedControllerBank
+
+        controller_channels = SimulatedControllerBank(args.simulate, latency=args.simulation_latency).channels
+        logger.info(f"Simulating {args.simulate} controller channel(s)")
+        run_server(args, controller_channels)
+
+
+def run_server(args, controller_channels):
+    metrics = None
+    if args.metrics_port is not None:
+        from .feature_implementations.metrics import ServiceMetrics
+
+        metrics = ServiceMetrics()
+
+    with profiled(args.profile):
+        server = Server(
+            controller_channels,
+            poll_interval=args.poll_interval,
+            subscription_buffer_size=args.subscription_buffer_size,
+            history_capacity=args.history_capacity,
+            idle_poll_interval=args.idle_poll_interval,
+            metrics=metrics,
+            min_set_point_interval=args.min_set_point_interval,
+            set_point_reconcile_interval=args.set_point_reconcile_interval,
+            max_grpc_workers=args.grpc_workers,
+        )
+
+        try:
+            server.start_insecure(args.ip_address, args.port, enable_discovery=not args.disable_discovery)
+            if metrics is not None:
+                metrics.serve(args.metrics_port, args.ip_address)
+                print(f"Serving metrics on http://{args.ip_address}:{metrics.port}/metrics")
+            print(f"Server startup complete, running on {args.ip_address}:{args.port}. Press Enter to stop it")
+
+            try:
+                input()
+            except (KeyboardInterrupt, EOFError):
+                pass
+        finally:
+            if metrics is not None:
+                metrics.shutdown()
+            server.stop()
+            print("Stopped server")
 
 
 def setup_basic_logging(args):
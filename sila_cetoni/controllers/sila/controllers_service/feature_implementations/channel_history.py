@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+SAMPLE_DTYPE = np.dtype("<f8")
+"""The data type of the `(timestamp, actual value, set point)` columns of a history sample"""
+
+SAMPLE_SIZE = 3 * SAMPLE_DTYPE.itemsize
+"""The size of a history sample in bytes"""
+
+
+def pack_samples(samples: np.ndarray) -> bytes:
+    """
+    Packs the `(n, 3)` array `samples` as returned by `ChannelHistory.query` into little-endian float64 records
+    """
+    return np.ascontiguousarray(samples, dtype=SAMPLE_DTYPE).tobytes()
+
+
+def unpack_samples(data: bytes) -> np.ndarray:
+    """
+    Inverse of `pack_samples`, returns a read-only `(n, 3)` array of `(timestamp, actual value, set point)` samples
+    without copying `data`
+    """
+    if len(data) % SAMPLE_SIZE:
+        raise ValueError(f"The size of the data ({len(data)} bytes) is not a multiple of {SAMPLE_SIZE} bytes")
+    return np.frombuffer(data, dtype=SAMPLE_DTYPE).reshape(-1, 3)
+
+
+def decode_sample_blocks(blocks: Iterable[Tuple[int, bytes]]) -> Dict[int, np.ndarray]:
+    """
+    Decodes the `(channel index, packed samples)` blocks of one or more `StreamSamples` intermediate responses (or the
+    history returned by `GetHistory`) into one `(n, 3)` array of `(timestamp, actual value, set point)` samples per
+    channel index, the blocks of each channel are concatenated in the given order
+    """
+    arrays: Dict[int, List[np.ndarray]] = {}
+    for channel_index, data in blocks:
+        arrays.setdefault(channel_index, []).append(unpack_samples(data))
+    return {
+        channel_index: channel_arrays[0] if len(channel_arrays) == 1 else np.concatenate(channel_arrays)
+        for channel_index, channel_arrays in arrays.items()
+    }
+
+
+class ChannelHistory:
+    """
+    A fixed-capacity ring buffer with the `(timestamp, actual value, set point)` samples of a controller channel
+
+    The samples are kept in a preallocated float64 array, i.e. a history uses `capacity * 24` bytes regardless of how
+    many samples have been added. When the buffer is full the oldest sample is overwritten.
+
+    The samples must be appended in chronological order. This allows `query` to find the requested time range with a
+    binary search, so its cost only depends on the number of returned samples.
+    """
+
+    __buffer: np.ndarray
+    __head: int  # index at which the next sample is written
+    __count: int
+    __lock: Lock
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        capacity: int
+            The maximum number of samples kept in the history
+        """
+        if capacity < 1:
+            raise ValueError(f"The capacity must be at least 1, got {capacity}")
+        self.__buffer = np.zeros((capacity, 3), dtype=SAMPLE_DTYPE)
+        self.__head = 0
+        self.__count = 0
+        self.__lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        return len(self.__buffer)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def append(self, timestamp: float, actual_value: float, set_point: float) -> None:
+        with self.__lock:
+            self.__buffer[self.__head] = (timestamp, actual_value, set_point)
+            self.__head = (self.__head + 1) % len(self.__buffer)
+            self.__count = min(self.__count + 1, len(self.__buffer))
+
+    def query(self, start_time: float = -np.inf, end_time: float = np.inf) -> np.ndarray:
+        """
+        Returns all samples with `start_time <= timestamp <= end_time`
+
+        Returns
+        -------
+        np.ndarray
+            A new `(n, 3)` array with the `(timestamp, actual value, set point)` samples in chronological order
+        """
+        with self.__lock:
+            # the samples in the buffer consist of (at most) two chronologically sorted segments: the older one from
+            # `__head` to the end of the buffer (only if the buffer is full) and the newer one from the start of the
+            # buffer up to `__head`
+            segments = [self.__buffer[: self.__head]]
+            if self.__count == len(self.__buffer):
+                segments.insert(0, self.__buffer[self.__head :])
+            parts = []
+            for segment in segments:
+                timestamps = segment[:, 0]
+                first = np.searchsorted(timestamps, start_time, side="left")
+                last = np.searchsorted(timestamps, end_time, side="right")
+                if first < last:
+                    parts.append(segment[first:last])
+            if not parts:
+                return np.empty((0, 3), dtype=SAMPLE_DTYPE)
+            return np.concatenate(parts)
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from qmixsdk.qmixcontroller import ControllerChannel
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelSample(NamedTuple):
+    """
+    A single sample of a controller channel as taken by the `ChannelPoller`
+    """
+
+    channel_index: int
+    timestamp: float  # seconds since the epoch
+    actual_value: float
+    set_point: float
+
+
+SweepListener = Callable[[List[ChannelSample]], None]
+TimingListener = Callable[[float, float], None]  # (sweep duration, jitter) in seconds
+
+
+class ChannelPoller:
+    """
+    Polls the actual value and the set point of all controller channels of a server in one timed sweep
+
+    Instead of running two periodic functions per channel (each of which occupies a thread of its own) a single thread
+    reads all channels one after another at a fixed rate. The samples of a sweep are then handed to all registered
+    listeners (see `add_listener`).
+
+    The poller is scheduled against absolute deadlines, i.e. the start of sweep `n` is planned for
+    `first_start + n * interval`. The deviation of the actual start from the planned start is available as `jitter`,
+    the time needed for the last sweep as `sweep_duration`. A sweep that takes longer than `interval` is counted as an
+    overrun and the missed deadlines are skipped instead of being caught up in a burst.
+
+    If an `idle_interval` is given, every channel is polled at a rate of its own: Channels that are marked as active
+    (see `set_active`), whose set point has changed or whose actual value changes faster than `rate_threshold` per
+    second are polled every `interval`. Otherwise the interval of the channel is doubled after every sample up to
+    `idle_interval`. All channel intervals are multiples of `interval`, so sweeps still start on the same grid of
+    deadlines but only read the channels that are due. Without an `idle_interval` all channels are read in every sweep.
+    """
+
+    __controller_channels: List[ControllerChannel]
+    __interval: float
+    __listeners: List[SweepListener]
+    __listeners_lock: Lock
+    __stop_event: Event
+    __thread: Optional[Thread]
+    __timing_listener: Optional[TimingListener]
+    __wake_event: Event  # interrupts waiting for the next sweep if a channel needs to be polled earlier
+
+    __max_channel_ticks: int  # `idle_interval` in multiples of `interval`
+    __rate_threshold: float
+    __schedule_lock: Lock
+    __active: List[bool]  # same number of items and order as `__controller_channels`
+    __channel_ticks: List[int]  # current poll interval of each channel in multiples of `interval`
+    __due_ticks: List[int]  # number of the sweep in which each channel is polled next
+    __current_tick: int
+    __poll_requests: Set[int]  # channels for which `request_poll` has been called since they were last polled
+    __last_samples: List[Optional[ChannelSample]]
+
+    __sweep_count: int
+    __overrun_count: int
+    __sweep_duration: float
+    __max_sweep_duration: float
+    __jitter: float
+    __max_jitter: float
+
+    def __init__(
+        self,
+        controller_channels: List[ControllerChannel],
+        interval: float = 0.1,
+        idle_interval: Optional[float] = None,
+        rate_threshold: float = 0.1,
+        timing_listener: Optional[TimingListener] = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        controller_channels: List[ControllerChannel]
+            The channels to poll, the index of a channel in this list is used as `ChannelSample.channel_index`
+        interval: float (default: 0.1)
+            The time between the start of two consecutive sweeps in seconds, i.e. the shortest poll interval of a
+            channel
+        idle_interval: float (optional)
+            The longest poll interval of an idle channel in seconds (rounded to a multiple of `interval`), if not given
+            all channels are polled every `interval`
+        rate_threshold: float (default: 0.1)
+            The rate of change of the actual value (in units of the value per second) above which a channel is polled
+            every `interval`
+        timing_listener: TimingListener (optional)
+            Called with the duration and the jitter of every sweep in seconds (e.g. to record them as metrics)
+        """
+        if interval <= 0:
+            raise ValueError(f"The poll interval must be positive, got {interval}")
+        if idle_interval is not None and idle_interval < interval:
+            raise ValueError(f"The idle poll interval must not be shorter than the poll interval, got {idle_interval}")
+
+        self.__controller_channels = controller_channels
+        self.__interval = interval
+        self.__listeners = []
+        self.__listeners_lock = Lock()
+        self.__stop_event = Event()
+        self.__thread = None
+        self.__timing_listener = timing_listener
+        self.__wake_event = Event()
+
+        self.__max_channel_ticks = 1 if idle_interval is None else max(1, round(idle_interval / interval))
+        self.__rate_threshold = rate_threshold
+        self.__schedule_lock = Lock()
+        self.__active = [False] * len(controller_channels)
+        self.__channel_ticks = [1] * len(controller_channels)
+        self.__due_ticks = [0] * len(controller_channels)
+        self.__current_tick = 0
+        self.__poll_requests = set()
+        self.__last_samples = [None] * len(controller_channels)
+
+        self.__sweep_count = 0
+        self.__overrun_count = 0
+        self.__sweep_duration = 0.0
+        self.__max_sweep_duration = 0.0
+        self.__jitter = 0.0
+        self.__max_jitter = 0.0
+
+    @property
+    def interval(self) -> float:
+        """
+        The time between the start of two consecutive sweeps in seconds
+        """
+        return self.__interval
+
+    @property
+    def channel_count(self) -> int:
+        return len(self.__controller_channels)
+
+    @property
+    def idle_interval(self) -> float:
+        """
+        The longest poll interval of an idle channel in seconds
+        """
+        return self.__max_channel_ticks * self.__interval
+
+    def channel_interval(self, channel_index: int) -> float:
+        """
+        The current poll interval of the channel with the given index in seconds
+        """
+        return self.__channel_ticks[channel_index] * self.__interval
+
+    def set_active(self, channel_index: int, active: bool) -> None:
+        """
+        Marks the channel with the given index as active (e.g. while its control loop is running) or idle
+
+        Active channels are always polled every `interval`. Marking a channel as active polls it in the next sweep.
+        """
+        with self.__schedule_lock:
+            self.__active[channel_index] = active
+        if active:
+            self.request_poll(channel_index)
+
+    def request_poll(self, channel_index: int) -> None:
+        """
+        Polls the channel with the given index in the next sweep and resets its poll interval to `interval` (e.g. after
+        its set point has been written)
+        """
+        with self.__schedule_lock:
+            self.__poll_requests.add(channel_index)
+            self.__channel_ticks[channel_index] = 1
+            self.__due_ticks[channel_index] = min(self.__due_ticks[channel_index], self.__current_tick + 1)
+        self._wake()
+
+    @property
+    def sweep_count(self) -> int:
+        """
+        The number of sweeps done since the poller has been started
+        """
+        return self.__sweep_count
+
+    @property
+    def overrun_count(self) -> int:
+        """
+        The number of sweeps that took longer than `interval`
+        """
+        return self.__overrun_count
+
+    @property
+    def sweep_duration(self) -> float:
+        """
+        The duration of the last sweep in seconds
+        """
+        return self.__sweep_duration
+
+    @property
+    def max_sweep_duration(self) -> float:
+        """
+        The longest sweep duration since the poller has been started in seconds
+        """
+        return self.__max_sweep_duration
+
+    @property
+    def jitter(self) -> float:
+        """
+        The delay of the start of the last sweep with respect to its planned start in seconds
+        """
+        return self.__jitter
+
+    @property
+    def max_jitter(self) -> float:
+        """
+        The largest delay of a sweep start since the poller has been started in seconds
+        """
+        return self.__max_jitter
+
+    @property
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def add_listener(self, listener: SweepListener) -> None:
+        """
+        Registers `listener` to be called with the list of samples of every sweep
+
+        Listeners are called from the poller's thread, so they should return quickly.
+        """
+        with self.__listeners_lock:
+            self.__listeners.append(listener)
+
+    def remove_listener(self, listener: SweepListener) -> None:
+        with self.__listeners_lock:
+            self.__listeners.remove(listener)
+
+    def start(self) -> None:
+        """
+        Starts polling in a background thread (has no effect if the poller is already running)
+        """
+        if self.is_running:
+            return
+        self.__stop_event.clear()
+        self.__thread = Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops polling and waits for the current sweep to finish
+        """
+        self.__stop_event.set()
+        self._wake()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def sweep(self, channel_indices: Optional[Sequence[int]] = None) -> List[ChannelSample]:
+        """
+        Reads the given channels (all channels by default) once and notifies the listeners
+
+        Returns
+        -------
+        List[ChannelSample]
+            The samples of all channels that could be read successfully
+        """
+        if channel_indices is None:
+            channel_indices = range(len(self.__controller_channels))
+        samples = [sample for sample in map(self._read_channel, channel_indices) if sample is not None]
+        self._notify_listeners(samples)
+        return samples
+
+    # The following methods are the steps of the polling loop (see `_run`)
+
+    def _read_channel(self, channel_index: int) -> Optional[ChannelSample]:
+        """
+        Reads the channel with the given index, returns `None` if that fails
+        """
+        channel = self.__controller_channels[channel_index]
+        try:
+            return ChannelSample(channel_index, time.time(), channel.read_actual_value(), channel.get_setpoint())
+        except Exception as err:
+            logger.error(f"Could not read controller channel {channel_index}: {err}")
+            return None
+
+    def _notify_listeners(self, samples: List[ChannelSample]) -> None:
+        with self.__listeners_lock:
+            listeners = list(self.__listeners)
+        for listener in listeners:
+            try:
+                listener(samples)
+            except Exception:
+                logger.error(f"Sweep listener {listener!r} failed", exc_info=True)
+
+    @property
+    def _is_stopping(self) -> bool:
+        return self.__stop_event.is_set()
+
+    def _wake(self) -> None:
+        """
+        Interrupts waiting for the next sweep (see `_wait`)
+        """
+        self.__wake_event.set()
+
+    def _reset_schedule(self) -> None:
+        """
+        Makes all channels due in the first sweep
+        """
+        with self.__schedule_lock:
+            self.__due_ticks = [0] * len(self.__controller_channels)
+
+    def _begin_sweep(self, tick: int, deadline: float) -> Tuple[List[int], float]:
+        """
+        Starts sweep number `tick` that has been planned to start at `deadline`
+
+        Returns
+        -------
+        Tuple[List[int], float]
+            The indices of the channels that are due in this sweep and the start time of the sweep
+        """
+        start = time.monotonic()
+        self.__jitter = max(0.0, start - deadline)
+        self.__max_jitter = max(self.__max_jitter, self.__jitter)
+        with self.__schedule_lock:
+            self.__current_tick = tick
+            due = [i for i, due_tick in enumerate(self.__due_ticks) if due_tick <= tick]
+            self.__poll_requests.difference_update(due)
+        return due, start
+
+    def _end_sweep(
+        self, due: List[int], samples: List[ChannelSample], tick: int, start: float, start_time: float
+    ) -> int:
+        """
+        Finishes sweep number `tick` that has read the `due` channels and started at `start`
+
+        Returns
+        -------
+        int
+            The number of the next sweep, skipping the deadlines that have been missed
+        """
+        self.__reschedule(due, samples, tick)
+
+        end = time.monotonic()
+        self.__sweep_count += 1
+        self.__sweep_duration = end - start
+        self.__max_sweep_duration = max(self.__max_sweep_duration, self.__sweep_duration)
+        if self.__timing_listener is not None:
+            self.__timing_listener(self.__sweep_duration, self.__jitter)
+
+        next_tick = tick + 1
+        if end > start_time + next_tick * self.__interval:
+            missed = int((end - start_time) // self.__interval) + 1 - next_tick
+            self.__overrun_count += 1
+            logger.debug(
+                f"Sweep took {self.__sweep_duration * 1000:.1f} ms (interval: {self.__interval * 1000:.1f} ms), "
+                f"skipping {missed} deadline(s)"
+            )
+            next_tick += missed
+        return next_tick
+
+    def _next_due_tick(self, next_tick: int) -> int:
+        """
+        Returns the number of the sweep in which the next channel is due (at least `next_tick`)
+
+        Has to be called before waiting for the sweep, any `_wake` after this call interrupts the wait.
+        """
+        with self.__schedule_lock:
+            tick = max(next_tick, min(self.__due_ticks, default=next_tick))
+            self.__wake_event.clear()
+        return tick
+
+    def __reschedule(self, polled: Sequence[int], samples: List[ChannelSample], tick: int) -> None:
+        """
+        Updates the poll intervals of the `polled` channels based on their new `samples` and plans their next poll
+        """
+        with self.__schedule_lock:
+            for sample in samples:
+                i = sample.channel_index
+                last = self.__last_samples[i]
+                self.__last_samples[i] = sample
+                if self.__max_channel_ticks == 1 or self.__active[i] or i in self.__poll_requests or last is None:
+                    self.__channel_ticks[i] = 1
+                    continue
+                elapsed = sample.timestamp - last.timestamp
+                rate = abs(sample.actual_value - last.actual_value) / elapsed if elapsed > 0 else math.inf
+                if sample.set_point != last.set_point or rate > self.__rate_threshold:
+                    self.__channel_ticks[i] = 1
+                else:
+                    self.__channel_ticks[i] = min(2 * self.__channel_ticks[i], self.__max_channel_ticks)
+            for i in polled:
+                # `request_poll` might have been called during the sweep
+                self.__due_ticks[i] = tick + (1 if i in self.__poll_requests else self.__channel_ticks[i])
+
+    def _run(self) -> None:
+        start_time = time.monotonic()
+        tick = 0
+        self._reset_schedule()
+        while not self._is_stopping:
+            due, start = self._begin_sweep(tick, start_time + tick * self.__interval)
+            samples = self.sweep(due)
+            next_tick = self._end_sweep(due, samples, tick, start, start_time)
+
+            # sleep until the next channel is due or until `request_poll` wants a channel to be polled earlier
+            while True:
+                tick = self._next_due_tick(next_tick)
+                timeout = start_time + tick * self.__interval - time.monotonic()
+                if timeout <= 0 or not self.__wake_event.wait(timeout) or self._is_stopping:
+                    break
@@ -2,105 +2,572 @@
 from __future__ import annotations
 
 import logging
-from functools import partial
-from queue import Queue
-from typing import List, Optional, Union, cast
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from math import nan
+from threading import Condition, Event, Lock
+from typing import TYPE_CHECKING, Callable, ContextManager, Dict, List, Optional, Set, Tuple, Union, cast
 
-from qmixsdk.qmixcontroller import ControllerChannel
+import numpy as np
 from sila2.framework import Command, Feature, FullyQualifiedIdentifier, Metadata, Property
-from sila2.server import MetadataDict, ObservableCommandInstance, SilaServer
+from sila2.server import (
+    MetadataDict,
+    ObservableCommandInstance,
+    ObservableCommandInstanceWithIntermediateResponses,
+    SilaServer,
+)
 
-from sila_cetoni.utils import PropertyUpdater, not_close
+from sila_cetoni.utils import not_close
 
 from ..generated.controlloopservice import (
+    ChannelLimitViolation,
+    ChannelLimitViolationEvent,
+    ChannelSetPoint,
+    ChannelValue,
     ControlLoopServiceBase,
     ControlLoopServiceFeature,
+    ControlLoopStopped,
+    GetDownsampledHistory_Responses,
+    GetHistory_Responses,
     InvalidChannelIndex,
+    InvalidLimits,
+    InvalidProfile,
+    ProfileAborted,
+    ProfilePoint,
     RunControlLoop_Responses,
+    RunControlLoopUntilSettled_IntermediateResponses,
+    RunControlLoopUntilSettled_Responses,
+    RunSetPointProfile_IntermediateResponses,
+    RunSetPointProfile_Responses,
+    SetChannelLimits_Responses,
+    SettleTimeout,
     StopControlLoop_Responses,
+    StreamSamples_IntermediateResponses,
+    StreamSamples_Responses,
     WriteSetPoint_Responses,
+    WriteSetPoints_Responses,
 )
+from .channel_history import SAMPLE_SIZE, ChannelHistory, pack_samples
+from .channel_poller import ChannelPoller, ChannelSample
+from .decimation import DecimationMode, decimate
+from .emission_filter import DEFAULT_EMISSION_POLICY, EmissionFilter, EmissionPolicy
+from .limit_monitor import ChannelLimits, LimitMonitor, LimitViolation, LimitViolationEvent
+from .metrics import METRIC_PREFIX, MetricFamily, Sample, ServiceMetrics
+from .sample_stream import SampleBlockBuffer
+from .serialized_channel import SerializedControllerChannel
+from .set_point_profile import ProfileInterpolation, SetPointProfile
+from .subscription_fanout import SubscriptionFanout
+from .trace_recorder import TraceRecorder
+
+if TYPE_CHECKING:
+    from qmixsdk.qmixcontroller import ControllerChannel
 
 logger = logging.getLogger(__name__)
 
+_NOT_TIMED = nullcontext()
+
 
 class ControlLoopServiceImpl(ControlLoopServiceBase):
-    __controller_channels: List[ControllerChannel]
+    __controller_channels: List[SerializedControllerChannel]
     __channel_index_identifier: Metadata[int]
-    __set_point_queues: List[Queue[float]]  # same number of items and order as `__controller_channels`
-    __controller_value_queues: List[Queue[float]]  # same number of items and order as `__controller_channels`
+    __set_point_queues: List[SubscriptionFanout[float]]  # same number of items and order as `__controller_channels`
+    __controller_value_queues: List[
+        SubscriptionFanout[float]
+    ]  # same number of items and order as `__controller_channels`
+    __channel_values_queue: SubscriptionFanout[List[ChannelValue]]
+    __emission_filters: Dict[str, List[EmissionFilter]]  # same keys and number of items as `subscription_queues`
+    __limit_monitor: LimitMonitor
+    __limit_violations_queue: SubscriptionFanout[List[Tuple[int, str, float, float, float]]]
+    __limit_violation_events_queue: SubscriptionFanout[List[Tuple[Tuple[int, str, float, float, float], bool, float]]]
+    __subscription_buffer_size: int
+    # checking or setting the limits and publishing the resulting violations is one critical section, so that the
+    # values of `LimitViolations` and `LimitViolationEvents` are in order (polling thread vs. commands)
+    __limit_violations_lock: Lock
+    __poller: ChannelPoller
+    __latest_samples: List[Optional[ChannelSample]]  # same number of items and order as `__controller_channels`
+    __sweep_condition: Condition  # notified after every sweep of `__poller` and when a control loop is stopped
+    __control_loop_stop_counts: List[int]  # how often `StopControlLoop` has been called per channel
+    __is_stopped: bool
+    __histories: List[ChannelHistory]  # same number of items and order as `__controller_channels` (or empty)
+    __profile_abort_events: Dict[int, Event]  # channel index -> abort event of the profile running on that channel
+    __profile_lock: Lock
+    __sample_streams: Set[SampleBlockBuffer]  # buffers of the running `StreamSamples` commands
+    __trace_recorder: Optional[TraceRecorder]
+    __metrics: Optional[ServiceMetrics]
+    __channel_names: Optional[List[str]]  # same number of items and order as `__controller_channels`
 
-    def __init__(self, server: SilaServer, controller_channels: List[ControllerChannel]):
+    def __init__(
+        self,
+        server: SilaServer,
+        controller_channels: List[ControllerChannel],
+        poll_interval: float = 0.1,
+        subscription_buffer_size: int = 10,
+        history_capacity: int = 36000,
+        trace_recorder: Optional[TraceRecorder] = None,
+        idle_poll_interval: Optional[float] = None,
+        metrics: Optional[ServiceMetrics] = None,
+        min_set_point_interval: float = 0,
+        set_point_reconcile_interval: Optional[float] = None,
+        channel_names: Optional[List[str]] = None,
+        emission_policies: Optional[Dict[str, Union[EmissionPolicy, List[EmissionPolicy]]]] = None,
+    ):
         super().__init__(server)
-        self.__controller_channels = controller_channels
+        # all calls to a channel (polling and commands) are serialized and concurrent set point writes are coalesced,
+        # so there is at most one write per `min_set_point_interval` on the bus per channel; with a
+        # `set_point_reconcile_interval` the set points are cached, so polling a channel mostly reads its actual value
+        self.__controller_channels = [
+            SerializedControllerChannel(channel, min_set_point_interval, set_point_reconcile_interval)
+            for channel in controller_channels
+        ]
         self.__channel_index_identifier = cast(Metadata, ControlLoopServiceFeature["ChannelIndex"])
+        # without `channel_names` the names are read from the channels when `ChannelNames` is requested for the first time
+        if channel_names is not None and len(channel_names) != len(self.__controller_channels):
+            raise ValueError(f"Got {len(channel_names)} channel names for {len(self.__controller_channels)} channels")
+        self.__channel_names = channel_names
 
-        self.__set_point_queues = []
-        self.__controller_value_queues = []
-        for i in range(len(self.__controller_channels)):
-            set_point_queue = Queue()
-            controller_value_queue = Queue()
+        # every value is sent to the subscribers of the respective channel right away by a `SubscriptionFanout` (instead
+        # of a producer queue and a forwarding thread per channel and property), which only buffers up to
+        # `subscription_buffer_size` values per subscriber
+        self.__subscription_buffer_size = subscription_buffer_size
+        self.__set_point_queues = [self.__create_fanout("SetPointValue") for _ in self.__controller_channels]
+        self.__controller_value_queues = [self.__create_fanout("ControllerValue") for _ in self.__controller_channels]
+        self.__channel_values_queue = self.__create_fanout("ChannelValues")
+        self.__emission_filters = self.__create_emission_filters(emission_policies or {})
 
-            self.__set_point_queues += [set_point_queue]
-            self.__controller_value_queues += [controller_value_queue]
+        # the limits are checked in the polling thread, subscribers of `LimitViolations` only get a new value when a
+        # violation starts or ends and subscribers of `LimitViolationEvents` get every start and end once
+        self.__limit_monitor = LimitMonitor(len(self.__controller_channels))
+        self.__limit_violations_queue = self.__create_fanout("LimitViolations")
+        self.__limit_violation_events_queue = self.__create_fanout("LimitViolationEvents", send_latest=False)
+        self.__limit_violations_lock = Lock()
+        self.update_LimitViolations([], queue=self.__limit_violations_queue)
 
-            self.run_periodically(
-                PropertyUpdater(
-                    self.__controller_channels[i].get_setpoint,
-                    not_close,
-                    partial(self.update_SetPointValue, queue=set_point_queue),
-                )
+        # one thread polls all channels instead of two `PropertyUpdater`s per channel, channels whose control loop is
+        # not running and whose value is stable are polled less often if `idle_poll_interval` is given
+        self.__metrics = metrics
+        self.__poller = ChannelPoller(
+            self.__controller_channels,
+            poll_interval,
+            idle_poll_interval,
+            timing_listener=self.__metrics.observe_sweep if self.__metrics is not None else None,
+        )
+        self.__poller.add_listener(self.__update_properties)
+
+        self.__latest_samples = [None] * len(self.__controller_channels)
+        self.__sweep_condition = Condition()
+        self.__control_loop_stop_counts = [0] * len(self.__controller_channels)
+        self.__is_stopped = False
+
+        # uses `history_capacity * 24` bytes per channel
+        self.__histories = (
+            [ChannelHistory(history_capacity) for _ in self.__controller_channels] if history_capacity > 0 else []
+        )
+
+        self.__profile_abort_events = {}
+        self.__profile_lock = Lock()
+        self.__sample_streams = set()
+
+        # the recorder only queues the samples in the polling thread, the files are written by a thread of its own
+        self.__trace_recorder = trace_recorder
+        if self.__trace_recorder is not None:
+            self.__poller.add_listener(self.__trace_recorder.record)
+
+        if self.__metrics is not None:
+            self.__metrics.add_collector(self.__collect_metrics)
+
+    def __create_fanout(self, property_identifier: str, send_latest: bool = True) -> SubscriptionFanout:
+        observable_property = cast(Property, ControlLoopServiceFeature[property_identifier])
+        return SubscriptionFanout(
+            property_identifier, observable_property.to_message, self.__subscription_buffer_size, send_latest
+        )
+
+    def __subscribe(self, fanout: SubscriptionFanout) -> SubscriptionFanout:
+        """
+        Registers `fanout` with the SiLA server before it is returned from a `..._on_subscription` method
+        """
+        fanout.register(self.parent_server, ControlLoopServiceFeature._identifier)
+        return fanout
+
+    def __create_emission_filters(
+        self, emission_policies: Dict[str, Union[EmissionPolicy, List[EmissionPolicy]]]
+    ) -> Dict[str, List[EmissionFilter]]:
+        """
+        Creates the filters that decide which values are sent to the subscription queues
+
+        `emission_policies` maps the name of an observable property to the policy for all channels or to a list with
+        the policy of each channel, properties that are not given use the `DEFAULT_EMISSION_POLICY`
+        """
+        unknown_properties = set(emission_policies) - {"SetPointValue", "ControllerValue", "ChannelValues"}
+        if unknown_properties:
+            raise ValueError(f"Unknown observable properties in the emission policies: {sorted(unknown_properties)}")
+
+        def filters(property_name: str, count: int) -> List[EmissionFilter]:
+            policies = emission_policies.get(property_name, DEFAULT_EMISSION_POLICY)
+            if isinstance(policies, EmissionPolicy):
+                return [EmissionFilter(policies) for _ in range(count)]
+            if len(policies) != count:
+                raise ValueError(f"Got {len(policies)} emission policies for {count} {property_name} queues")
+            return [EmissionFilter(policy) for policy in policies]
+
+        return {
+            "SetPointValue": filters("SetPointValue", len(self.__controller_channels)),
+            "ControllerValue": filters("ControllerValue", len(self.__controller_channels)),
+            "ChannelValues": filters("ChannelValues", 1),
+        }
+
+    @property
+    def poller(self) -> ChannelPoller:
+        """
+        The `ChannelPoller` that periodically reads all controller channels (e.g. to monitor its timing)
+        """
+        return self.__poller
+
+    @property
+    def trace_recorder(self) -> Optional[TraceRecorder]:
+        """
+        The `TraceRecorder` that records all polled values to disk (if any)
+        """
+        return self.__trace_recorder
+
+    @property
+    def metrics(self) -> Optional[ServiceMetrics]:
+        """
+        The `ServiceMetrics` of this feature (if enabled)
+        """
+        return self.__metrics
+
+    @property
+    def limit_monitor(self) -> LimitMonitor:
+        """
+        The `LimitMonitor` that checks the polled values against the limits of the channels
+        """
+        return self.__limit_monitor
+
+    @property
+    def subscription_queues(self) -> Dict[str, List[SubscriptionFanout]]:
+        """
+        The `SubscriptionFanout`s of all observable properties per channel (e.g. to monitor the dropped items per
+        subscriber)
+        """
+        return {
+            "SetPointValue": self.__set_point_queues,
+            "ControllerValue": self.__controller_value_queues,
+            "ChannelValues": [self.__channel_values_queue],
+            "LimitViolations": [self.__limit_violations_queue],
+            "LimitViolationEvents": [self.__limit_violation_events_queue],
+        }
+
+    def start(self) -> None:
+        super().start()
+        if self.__trace_recorder is not None:
+            self.__trace_recorder.start()
+        self.__poller.start()
+
+    def stop(self) -> None:
+        with self.__sweep_condition:
+            self.__is_stopped = True
+            self.__sweep_condition.notify_all()
+            for stream in self.__sample_streams:
+                stream.close()
+        with self.__profile_lock:
+            for abort_event in self.__profile_abort_events.values():
+                abort_event.set()
+        self.__poller.stop()
+        if self.__trace_recorder is not None:
+            self.__trace_recorder.stop()
+        super().stop()
+
+    def __update_properties(self, samples: List[ChannelSample]) -> None:
+        set_point_filters = self.__emission_filters["SetPointValue"]
+        controller_value_filters = self.__emission_filters["ControllerValue"]
+        for sample in samples:
+            i = sample.channel_index
+            self.__latest_samples[i] = sample
+            if self.__histories:
+                self.__histories[i].append(sample.timestamp, sample.actual_value, sample.set_point)
+            if set_point_filters[i].accept(sample.set_point, sample.timestamp):
+                self.update_SetPointValue(sample.set_point, queue=self.__set_point_queues[i])
+            if controller_value_filters[i].accept(sample.actual_value, sample.timestamp):
+                self.update_ControllerValue(sample.actual_value, queue=self.__controller_value_queues[i])
+
+        # `ChannelValues` has a filter of its own over the latest samples of all channels, independent of the values
+        # that the filters of the other properties have let through
+        channel_values = [
+            (nan, nan) if sample is None else (sample.actual_value, sample.set_point)
+            for sample in self.__latest_samples
+        ]
+        if self.__emission_filters["ChannelValues"][0].accept_all(
+            [value for channel_value in channel_values for value in channel_value], time.time()
+        ):
+            self.update_ChannelValues(channel_values, queue=self.__channel_values_queue)
+
+        with self.__limit_violations_lock:
+            self.__publish_limit_violations(self.__limit_monitor.evaluate(samples))
+
+        with self.__sweep_condition:
+            self.__sweep_condition.notify_all()
+
+    def __publish_limit_violations(self, events: List[LimitViolationEvent]) -> None:
+        """
+        Sends the `events` and the resulting active violations to the subscribers (has to be called with
+        `__limit_violations_lock` held by the same critical section that has produced the `events`)
+        """
+        if not events:
+            return
+
+        def to_tuple(violation: LimitViolation) -> Tuple[int, str, float, float, float]:
+            return (
+                violation.channel_index,
+                violation.kind.value,
+                violation.value,
+                violation.limit,
+                violation.start_time,
             )
 
-            self.run_periodically(
-                PropertyUpdater(
-                    self.__controller_channels[i].read_actual_value,
-                    not_close,
-                    partial(self.update_ControllerValue, queue=controller_value_queue),
+        self.update_LimitViolations(
+            [to_tuple(violation) for violation in self.__limit_monitor.violations],
+            queue=self.__limit_violations_queue,
+        )
+        self.update_LimitViolationEvents(
+            [(to_tuple(event.violation), event.is_active, event.timestamp) for event in events],
+            queue=self.__limit_violation_events_queue,
+        )
+
+    def __timed(self, command: str, channel_index: int) -> ContextManager:
+        """
+        Records the duration of the `with` block as the latency of `command` on the given channel if metrics are enabled
+        """
+        if self.__metrics is None:
+            return _NOT_TIMED
+        return self.__metrics.time_command(command, channel_index)
+
+    def __collect_metrics(self) -> List[MetricFamily]:
+        def family(name: str, type: str, help: str, samples: List[Tuple[Dict[str, str], float]]) -> MetricFamily:
+            return MetricFamily(
+                METRIC_PREFIX + name,
+                type,
+                help,
+                [Sample(METRIC_PREFIX + name, labels, value) for labels, value in samples],
+            )
+
+        queues = [
+            ({"property": property_name, "channel": str(i) if len(property_queues) > 1 else ""}, queue)
+            for property_name, property_queues in self.subscription_queues.items()
+            for i, queue in enumerate(property_queues)
+        ]
+        families = [
+            family(
+                "poll_sweeps_total",
+                "counter",
+                "Number of sweeps of the channel poller",
+                [({}, self.__poller.sweep_count)],
+            ),
+            family(
+                "poll_overruns_total",
+                "counter",
+                "Number of sweeps that took longer than the poll interval",
+                [({}, self.__poller.overrun_count)],
+            ),
+            family(
+                "poll_max_sweep_duration_seconds",
+                "gauge",
+                "Longest sweep of the channel poller",
+                [({}, self.__poller.max_sweep_duration)],
+            ),
+            family(
+                "poll_interval_seconds",
+                "gauge",
+                "Current poll interval per channel",
+                [
+                    ({"channel": str(i)}, self.__poller.channel_interval(i))
+                    for i in range(len(self.__controller_channels))
+                ],
+            ),
+            family(
+                "subscription_queue_depth",
+                "gauge",
+                "Largest number of items waiting to be sent to a subscriber",
+                [(labels, queue.qsize()) for labels, queue in queues],
+            ),
+            family(
+                "subscription_queue_capacity",
+                "gauge",
+                "Number of items buffered per subscriber at most",
+                [(labels, queue.capacity) for labels, queue in queues],
+            ),
+            family(
+                "subscription_queue_dropped_total",
+                "counter",
+                "Number of items dropped for all subscribers that did not keep up",
+                [(labels, queue.dropped) for labels, queue in queues],
+            ),
+            family(
+                "subscriber_dropped_total",
+                "counter",
+                "Number of items dropped for each current subscriber that did not keep up",
+                [
+                    (dict(labels, subscriber=subscriber.peer), subscriber.dropped)
+                    for labels, queue in queues
+                    for subscriber in queue.subscribers
+                ],
+            ),
+            family(
+                "subscription_suppressed_updates_total",
+                "counter",
+                "Number of changed values not sent to the subscription queues because of the emission policy",
+                [
+                    (
+                        {"property": property_name, "channel": str(i) if len(property_filters) > 1 else ""},
+                        emission_filter.suppressed,
+                    )
+                    for property_name, property_filters in self.__emission_filters.items()
+                    for i, emission_filter in enumerate(property_filters)
+                ],
+            ),
+            family(
+                "set_point_bus_writes_total",
+                "counter",
+                "Number of set point writes sent to the channels",
+                [({"channel": str(i)}, channel.bus_writes) for i, channel in enumerate(self.__controller_channels)],
+            ),
+            family(
+                "set_point_coalesced_writes_total",
+                "counter",
+                "Number of set point writes replaced by a newer set point before they were sent to the channels",
+                [
+                    ({"channel": str(i)}, channel.coalesced_writes)
+                    for i, channel in enumerate(self.__controller_channels)
+                ],
+            ),
+            family(
+                "set_point_skipped_writes_total",
+                "counter",
+                "Number of set point writes skipped because the channel already had the set point",
+                [({"channel": str(i)}, channel.skipped_writes) for i, channel in enumerate(self.__controller_channels)],
+            ),
+            family(
+                "set_point_cache_hits_total",
+                "counter",
+                "Number of set point reads answered from the set point cache",
+                [({"channel": str(i)}, channel.cache_hits) for i, channel in enumerate(self.__controller_channels)],
+            ),
+        ]
+        with self.__profile_lock:
+            running_profiles = len(self.__profile_abort_events)
+        families.append(
+            family("running_profiles", "gauge", "Number of running set point profiles", [({}, running_profiles)])
+        )
+        if self.__trace_recorder is not None:
+            families.append(
+                family(
+                    "trace_recorder_dropped_sweeps_total",
+                    "counter",
+                    "Number of sweeps the trace recorder could not keep up with",
+                    [({}, self.__trace_recorder.dropped_sweeps)],
                 )
             )
+        return families
 
     def get_NumberOfChannels(self, *, metadata: MetadataDict) -> int:
         return len(self.__controller_channels)
 
-    def SetPointValue_on_subscription(self, *, metadata: MetadataDict) -> Optional[Queue[float]]:
-        channel_index = metadata.get(self.__channel_index_identifier, 0)
-        try:
-            if channel_index < 0:
-                raise IndexError
-            return self.__set_point_queues[channel_index]
-        except IndexError:
-            raise InvalidChannelIndex(
-                message=f"The sent channel index {channel_index} is invalid. The index must be between 0 and {len(self.__controller_channels) - 1}.",
-            )
+    def get_ChannelNames(self, *, metadata: MetadataDict) -> List[str]:
+        if self.__channel_names is None:
+            self.__channel_names = [channel.get_name() for channel in self.__controller_channels]
+        return self.__channel_names
 
-    def ControllerValue_on_subscription(self, *, metadata: MetadataDict) -> Optional[Queue[float]]:
-        channel_index = metadata.get(self.__channel_index_identifier, 0)
-        try:
-            return self.__controller_value_queues[channel_index]
-        except IndexError:
-            raise InvalidChannelIndex(
-                message=f"The sent channel index {channel_index} is invalid. The index must be between 0 and {len(self.__controller_channels) - 1}.",
-            )
+    def SetPointValue_on_subscription(self, *, metadata: MetadataDict) -> SubscriptionFanout[float]:
+        channel_index: int = metadata.get(self.__channel_index_identifier, 0)
+        return self.__subscribe(self.__set_point_queues[self.__validate_channel_index(channel_index)])
 
-    def __controller_channel_for_index(self, channel_index: int) -> ControllerChannel:
-        try:
-            return self.__controller_channels[channel_index]
-        except IndexError:
+    def ControllerValue_on_subscription(self, *, metadata: MetadataDict) -> SubscriptionFanout[float]:
+        channel_index: int = metadata.get(self.__channel_index_identifier, 0)
+        return self.__subscribe(self.__controller_value_queues[self.__validate_channel_index(channel_index)])
+
+    def ChannelValues_on_subscription(self, *, metadata: MetadataDict) -> SubscriptionFanout[List[ChannelValue]]:
+        return self.__subscribe(self.__channel_values_queue)
+
+    def LimitViolations_on_subscription(
+        self, *, metadata: MetadataDict
+    ) -> SubscriptionFanout[List[ChannelLimitViolation]]:
+        return self.__subscribe(self.__limit_violations_queue)
+
+    def LimitViolationEvents_on_subscription(
+        self, *, metadata: MetadataDict
+    ) -> SubscriptionFanout[List[ChannelLimitViolationEvent]]:
+        return self.__subscribe(self.__limit_violation_events_queue)
+
+    def __validate_channel_index(self, channel_index: int) -> int:
+        if not 0 <= channel_index < len(self.__controller_channels):
             raise InvalidChannelIndex(
                 message=f"The sent channel index {channel_index} is invalid. The index must be between 0 and {len(self.__controller_channels) - 1}.",
             )
+        return channel_index
+
+    def __controller_channel_for_index(self, channel_index: int) -> SerializedControllerChannel:
+        return self.__controller_channels[self.__validate_channel_index(channel_index)]
 
     def WriteSetPoint(self, SetPointValue: float, *, metadata: MetadataDict) -> WriteSetPoint_Responses:
         channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
         logger.debug(f"channel id: {channel_identifier}")
-        self.__controller_channel_for_index(channel_identifier).write_setpoint(SetPointValue)
+        channel = self.__controller_channel_for_index(channel_identifier)
+        with self.__timed("WriteSetPoint", channel_identifier):
+            channel.write_setpoint(SetPointValue)
+        self.__poller.request_poll(channel_identifier)
         return WriteSetPoint_Responses()
 
+    def WriteSetPoints(self, SetPoints: List[ChannelSetPoint], *, metadata: MetadataDict) -> WriteSetPoints_Responses:
+        # look up all channels first so that nothing is written if any of the indices is invalid
+        writes = [
+            (
+                set_point.ChannelIndex,
+                self.__controller_channel_for_index(set_point.ChannelIndex),
+                set_point.SetPointValue,
+            )
+            for set_point in SetPoints
+        ]
+        write_durations: List[float] = []
+        for channel_index, channel, set_point_value in writes:
+            start = time.perf_counter()
+            channel.write_setpoint(set_point_value)
+            write_durations.append(time.perf_counter() - start)
+            self.__poller.request_poll(channel_index)
+        logger.debug(f"Wrote {len(writes)} set point(s) in {sum(write_durations) * 1000:.1f} ms")
+        return WriteSetPoints_Responses(write_durations)
+
+    def SetChannelLimits(
+        self,
+        HighLimit: float,
+        LowLimit: float,
+        MaxDeviation: float,
+        DeviationHoldTime: float,
+        MaxRateOfChange: float,
+        *,
+        metadata: MetadataDict,
+    ) -> SetChannelLimits_Responses:
+        channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
+        self.__validate_channel_index(channel_identifier)
+        limits = ChannelLimits(HighLimit, LowLimit, MaxDeviation, DeviationHoldTime, MaxRateOfChange)
+        try:
+            with self.__limit_violations_lock:
+                self.__publish_limit_violations(self.__limit_monitor.set_limits(channel_identifier, limits))
+        except ValueError as err:
+            raise InvalidLimits(message=str(err))
+        logger.debug(f"Limits of channel {channel_identifier}: {limits}")
+        return SetChannelLimits_Responses()
+
     def StopControlLoop(self, *, metadata: MetadataDict) -> StopControlLoop_Responses:
         channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
         logger.debug(f"channel id: {channel_identifier}")
-        self.__controller_channel_for_index(channel_identifier).enable_control_loop(False)
+        channel = self.__controller_channel_for_index(channel_identifier)
+        with self.__timed("StopControlLoop", channel_identifier):
+            channel.enable_control_loop(False)
+        self.__poller.set_active(channel_identifier, False)
+        self.__abort_profile(channel_identifier)
+        with self.__sweep_condition:
+            self.__control_loop_stop_counts[channel_identifier] += 1
+            self.__sweep_condition.notify_all()
         return StopControlLoop_Responses()
 
     def RunControlLoop(
@@ -111,9 +578,259 @@ class ControlLoopServiceImpl(ControlLoopServiceBase):
     ) -> RunControlLoop_Responses:
         channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
         logger.debug(f"channel id: {channel_identifier}")
-        self.__controller_channel_for_index(channel_identifier).enable_control_loop(True)
+        channel = self.__controller_channel_for_index(channel_identifier)
+        with self.__timed("RunControlLoop", channel_identifier):
+            self.__start_control_loop(channel_identifier, channel)
         return RunControlLoop_Responses()
 
+    def RunControlLoopUntilSettled(
+        self,
+        SettleTolerance: float,
+        SettleTime: float,
+        Timeout: float,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[RunControlLoopUntilSettled_IntermediateResponses],
+    ) -> RunControlLoopUntilSettled_Responses:
+        channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
+        logger.debug(f"channel id: {channel_identifier}")
+        channel = self.__controller_channel_for_index(channel_identifier)
+        with self.__sweep_condition:
+            stop_count = self.__control_loop_stop_counts[channel_identifier]
+        # only starting the control loop is a command latency, waiting for it to settle is not
+        with self.__timed("RunControlLoopUntilSettled", channel_identifier):
+            self.__start_control_loop(channel_identifier, channel)
+
+        instance.begin_execution()
+        instance.progress = 0
+        # only samples taken after the control loop has been started count towards settling
+        start = time.time()
+        deadline = time.monotonic() + Timeout
+        settled_since: Optional[float] = None
+        deviation: Optional[float] = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SettleTimeout(
+                    message=f"The control loop of channel {channel_identifier} has not settled within {Timeout} s "
+                    f"(deviation: {deviation})"
+                )
+            with self.__sweep_condition:
+                self.__sweep_condition.wait(min(self.__poller.interval * 10, remaining))
+                if self.__is_stopped or self.__control_loop_stop_counts[channel_identifier] != stop_count:
+                    raise ControlLoopStopped()
+                sample = self.__latest_samples[channel_identifier]
+            if sample is None or sample.timestamp < start:
+                continue
+
+            new_deviation = sample.actual_value - sample.set_point
+            if deviation is None or not_close(new_deviation, deviation):
+                deviation = new_deviation
+                instance.send_intermediate_response(RunControlLoopUntilSettled_IntermediateResponses(deviation))
+
+            if abs(deviation) > SettleTolerance:
+                if settled_since is not None:
+                    settled_since = None
+                    instance.progress = 0
+                continue
+            if settled_since is None:
+                settled_since = sample.timestamp
+            settled_time = sample.timestamp - settled_since
+            if settled_time >= SettleTime:
+                break
+            instance.progress = settled_time / SettleTime
+            instance.estimated_remaining_time = timedelta(seconds=min(SettleTime - settled_time, remaining))
+
+        logger.debug(f"Control loop of channel {channel_identifier} settled (deviation: {deviation})")
+        instance.progress = 1
+        instance.estimated_remaining_time = timedelta(0)
+        return RunControlLoopUntilSettled_Responses()
+
+    def __start_control_loop(self, channel_identifier: int, channel: SerializedControllerChannel) -> None:
+        channel.enable_control_loop(True)
+        self.__poller.set_active(channel_identifier, True)
+
+    def RunSetPointProfile(
+        self,
+        Profile: List[ProfilePoint],
+        Interpolation: str,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[RunSetPointProfile_IntermediateResponses],
+    ) -> RunSetPointProfile_Responses:
+        channel_identifier: int = metadata.get(self.__channel_index_identifier, 0)
+        logger.debug(f"channel id: {channel_identifier}")
+        channel = self.__controller_channel_for_index(channel_identifier)
+        try:
+            profile = SetPointProfile(
+                ((point.Time, point.SetPointValue) for point in Profile), ProfileInterpolation(Interpolation)
+            )
+        except ValueError as err:
+            raise InvalidProfile(message=str(err))
+
+        abort_event = self.__begin_profile(channel_identifier)
+        try:
+            instance.begin_execution()
+            # a linear ramp is written at the poll rate, a step profile only at the times of its points
+            update_interval = self.__poller.interval
+            last_info_update = 0.0
+            set_point: Optional[float] = None
+            start = time.monotonic()
+            while True:
+                elapsed = time.monotonic() - start
+                new_set_point = profile.set_point_at(elapsed)
+                if new_set_point != set_point:
+                    channel.write_setpoint(new_set_point)
+                    self.__poller.request_poll(channel_identifier)
+                    set_point = new_set_point
+                    instance.send_intermediate_response(RunSetPointProfile_IntermediateResponses(set_point))
+
+                remaining = max(0.0, profile.duration - elapsed)
+                if remaining == 0 or elapsed - last_info_update >= 1:
+                    instance.progress = 1 if remaining == 0 else elapsed / profile.duration
+                    instance.estimated_remaining_time = timedelta(seconds=remaining)
+                    last_info_update = elapsed
+                if remaining == 0:
+                    break
+
+                if profile.interpolation is ProfileInterpolation.STEP:
+                    timeout = profile.next_change_after(elapsed) - elapsed
+                else:
+                    timeout = min(update_interval, remaining)
+                if abort_event.wait(timeout):
+                    raise ProfileAborted()
+        finally:
+            self.__end_profile(channel_identifier, abort_event)
+        return RunSetPointProfile_Responses()
+
+    def GetHistory(
+        self, ChannelIndices: List[int], StartTime: float, EndTime: float, *, metadata: MetadataDict
+    ) -> GetHistory_Responses:
+        return GetHistory_Responses(self.__query_histories(ChannelIndices, StartTime, EndTime))
+
+    def GetDownsampledHistory(
+        self,
+        ChannelIndices: List[int],
+        StartTime: float,
+        EndTime: float,
+        Mode: str,
+        PointCount: int,
+        *,
+        metadata: MetadataDict,
+    ) -> GetDownsampledHistory_Responses:
+        mode = DecimationMode(Mode)
+        return GetDownsampledHistory_Responses(
+            self.__query_histories(
+                ChannelIndices, StartTime, EndTime, lambda samples: decimate(samples, mode, PointCount)
+            )
+        )
+
+    def StreamSamples(
+        self,
+        ChannelIndices: List[int],
+        BlockSize: int,
+        MaxLatency: float,
+        Duration: float,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[StreamSamples_IntermediateResponses],
+    ) -> StreamSamples_Responses:
+        for channel_index in ChannelIndices:
+            self.__validate_channel_index(channel_index)
+
+        # every sample of the channels is collected from the poller, so a block of `BlockSize` samples per channel
+        # costs one message instead of up to `BlockSize` `ControllerValue` and `SetPointValue` messages
+        stream = SampleBlockBuffer(ChannelIndices, BlockSize, MaxLatency)
+        with self.__sweep_condition:
+            if self.__is_stopped:
+                stream.close()
+            self.__sample_streams.add(stream)
+        self.__poller.add_listener(stream.add)
+        sample_count = 0
+        try:
+            instance.begin_execution()
+            start = time.monotonic()
+            while True:
+                elapsed = time.monotonic() - start
+                remaining = Duration - elapsed if Duration > 0 else 1
+                if remaining <= 0 or stream.is_closed:
+                    break
+                # wake up at least once per second to update the progress
+                blocks = stream.take_blocks(min(remaining, 1))
+                if blocks:
+                    sample_count += sum(len(samples) for _, samples in blocks) // SAMPLE_SIZE
+                    instance.send_intermediate_response(StreamSamples_IntermediateResponses(blocks))
+                if Duration > 0:
+                    instance.progress = min(1.0, elapsed / Duration)
+                    instance.estimated_remaining_time = timedelta(seconds=max(0.0, remaining))
+        finally:
+            self.__poller.remove_listener(stream.add)
+            with self.__sweep_condition:
+                self.__sample_streams.discard(stream)
+
+        blocks = stream.flush()
+        if blocks:
+            sample_count += sum(len(samples) for _, samples in blocks) // SAMPLE_SIZE
+            instance.send_intermediate_response(StreamSamples_IntermediateResponses(blocks))
+        if stream.dropped:
+            logger.warning(f"Dropped {stream.dropped} sample(s) while streaming because the client did not keep up")
+        return StreamSamples_Responses(sample_count)
+
+    def __query_histories(
+        self,
+        channel_indices: List[int],
+        start_time: float,
+        end_time: float,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> List[Tuple[int, bytes]]:
+        """
+        Returns the packed samples of the histories of the given channels in the given time range (after applying
+        `transform` to the samples of each channel)
+        """
+        for channel_index in channel_indices:
+            self.__validate_channel_index(channel_index)
+        if not self.__histories:
+            logger.warning("The history of the channels has been requested but the history is disabled")
+            return [(channel_index, b"") for channel_index in channel_indices]
+
+        histories = []
+        for channel_index in channel_indices:
+            samples = self.__histories[channel_index].query(start_time, end_time)
+            if transform is not None:
+                samples = transform(samples)
+            histories.append((channel_index, pack_samples(samples)))
+        return histories
+
+    def __begin_profile(self, channel_index: int) -> Event:
+        """
+        Registers a new profile for the channel with the given index, a profile that is already running on this channel
+        is aborted
+
+        Returns
+        -------
+        Event
+            The event that is set when the new profile shall be aborted
+        """
+        abort_event = Event()
+        with self.__profile_lock:
+            running_profile_abort_event = self.__profile_abort_events.get(channel_index)
+            if running_profile_abort_event is not None:
+                logger.info(f"Aborting the running profile of channel {channel_index} in favour of a new one")
+                running_profile_abort_event.set()
+            self.__profile_abort_events[channel_index] = abort_event
+        return abort_event
+
+    def __end_profile(self, channel_index: int, abort_event: Event) -> None:
+        with self.__profile_lock:
+            if self.__profile_abort_events.get(channel_index) is abort_event:
+                del self.__profile_abort_events[channel_index]
+
+    def __abort_profile(self, channel_index: int) -> None:
+        with self.__profile_lock:
+            abort_event = self.__profile_abort_events.get(channel_index)
+            if abort_event is not None:
+                abort_event.set()
+
     def get_calls_affected_by_ChannelIndex(
         self,
     ) -> List[Union[Feature, Command, Property, FullyQualifiedIdentifier]]:
@@ -123,7 +840,10 @@ class ControlLoopServiceImpl(ControlLoopServiceBase):
             return [
                 cast(Command, ControlLoopServiceFeature["WriteSetPoint"]),
                 cast(Command, ControlLoopServiceFeature["RunControlLoop"]),
+                cast(Command, ControlLoopServiceFeature["RunControlLoopUntilSettled"]),
                 cast(Command, ControlLoopServiceFeature["StopControlLoop"]),
+                cast(Command, ControlLoopServiceFeature["SetChannelLimits"]),
+                cast(Command, ControlLoopServiceFeature["RunSetPointProfile"]),
                 cast(Command, ControlLoopServiceFeature["ControllerValue"]),
                 cast(Command, ControlLoopServiceFeature["SetPointValue"]),
             ]
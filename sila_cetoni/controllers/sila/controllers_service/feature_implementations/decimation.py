@@ -0,0 +1,125 @@
+"""
+Downsampling of `(n, 3)` arrays of `(timestamp, actual value, set point)` samples as returned by `ChannelHistory.query`
+
+All functions expect the samples in chronological order and return a new array of the same layout with at most the
+requested number of points. If there are no more samples than requested points, a copy of the samples is returned.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Tuple
+
+import numpy as np
+
+
+class DecimationMode(Enum):
+    MIN_MAX = "MinMax"
+    """The samples with the smallest and the largest actual value per time bucket (two points per bucket)"""
+
+    MEAN = "Mean"
+    """The mean of all samples (including their timestamps) per time bucket"""
+
+    LTTB = "LTTB"
+    """Largest-Triangle-Three-Buckets on the actual values"""
+
+
+def _time_buckets(timestamps: np.ndarray, bucket_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assigns the samples to `bucket_count` buckets of equal duration
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The index of the (non-empty) bucket of each sample and the index of the first sample of each non-empty bucket
+    """
+    duration = timestamps[-1] - timestamps[0]
+    if duration <= 0:
+        buckets = np.zeros(len(timestamps), dtype=np.intp)
+    else:
+        buckets = ((timestamps - timestamps[0]) * (bucket_count / duration)).astype(np.intp)
+        np.minimum(buckets, bucket_count - 1, out=buckets)
+    _, starts, bucket_indices = np.unique(buckets, return_index=True, return_inverse=True)
+    return bucket_indices, starts
+
+
+def min_max(samples: np.ndarray, point_count: int) -> np.ndarray:
+    """
+    Keeps the samples with the smallest and the largest actual value of each of `point_count // 2` time buckets
+    """
+    if len(samples) <= point_count:
+        return samples.copy()
+    bucket_count = point_count // 2
+    values = samples[:, 1]
+    bucket_indices, starts = _time_buckets(samples[:, 0], bucket_count)
+    bucket_mins = np.minimum.reduceat(values, starts)
+    bucket_maxs = np.maximum.reduceat(values, starts)
+    # the first sample per bucket that equals the minimum/maximum of the bucket
+    is_min = np.flatnonzero(values == bucket_mins[bucket_indices])
+    is_max = np.flatnonzero(values == bucket_maxs[bucket_indices])
+    _, min_positions = np.unique(bucket_indices[is_min], return_index=True)
+    _, max_positions = np.unique(bucket_indices[is_max], return_index=True)
+    return samples[np.union1d(is_min[min_positions], is_max[max_positions])]
+
+
+def mean(samples: np.ndarray, point_count: int) -> np.ndarray:
+    """
+    Averages all samples of each of `point_count` time buckets
+    """
+    if len(samples) <= point_count:
+        return samples.copy()
+    _, starts = _time_buckets(samples[:, 0], point_count)
+    counts = np.diff(np.append(starts, len(samples)))
+    return np.add.reduceat(samples, starts, axis=0) / counts[:, np.newaxis]
+
+
+def lttb(samples: np.ndarray, point_count: int) -> np.ndarray:
+    """
+    Selects `point_count` samples with the Largest-Triangle-Three-Buckets algorithm (Sveinn Steinarsson, 2013) based on
+    the actual values
+
+    The first and the last sample are always kept. The samples in between are split into `point_count - 2` buckets with
+    the same number of samples and from each bucket the sample is chosen that forms the largest triangle with the sample
+    chosen from the previous bucket and the average of the next bucket. The area computation of a bucket is vectorized,
+    so the loop only runs once per returned point.
+    """
+    n = len(samples)
+    if n <= point_count:
+        return samples.copy()
+    if point_count < 3:
+        return samples[[0, -1]]
+    x = samples[:, 0]
+    y = samples[:, 1]
+
+    edges = np.linspace(1, n - 1, point_count - 1).astype(np.intp)
+    # averages of all buckets (plus the last sample as the "next bucket" of the last bucket)
+    sums_x = np.add.reduceat(x[: n - 1], edges[:-1])
+    sums_y = np.add.reduceat(y[: n - 1], edges[:-1])
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(point_count, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(point_count - 2):
+        start, end = edges[i], edges[i + 1]
+        # twice the triangle areas, the factor doesn't matter for the comparison
+        areas = np.abs((x[a] - avg_x[i + 1]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return samples[selected]
+
+
+def decimate(samples: np.ndarray, mode: DecimationMode, point_count: int) -> np.ndarray:
+    """
+    Downsamples `samples` to at most `point_count` points using the given `mode`
+    """
+    if point_count < 2:
+        raise ValueError(f"The point count must be at least 2, got {point_count}")
+    if mode is DecimationMode.MIN_MAX:
+        return min_max(samples, point_count)
+    if mode is DecimationMode.MEAN:
+        return mean(samples, point_count)
+    return lttb(samples, point_count)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+
+class EmissionPolicy(NamedTuple):
+    """
+    When a new value of an observable property is sent to its subscribers
+
+    A value is sent if it differs from the last sent value by more than the deadband (`absolute_tolerance` or
+    `relative_tolerance` times the larger magnitude, like `math.isclose`) and the last value has been sent at least
+    `min_interval` seconds ago. Independent of the value, it is sent if the last value has been sent `max_interval`
+    seconds ago (a heartbeat that shows subscribers of an idle channel that the server is alive).
+
+    The values are only checked when the channels are polled, so a heartbeat may be delayed by up to the poll interval
+    of the channel.
+    """
+
+    absolute_tolerance: float = 0.0
+    relative_tolerance: float = 1e-9
+    min_interval: float = 0.0
+    max_interval: Optional[float] = None
+
+
+DEFAULT_EMISSION_POLICY = EmissionPolicy()
+"""Sends every value that is not equal to the last sent value within floating point precision"""
+
+
+class EmissionFilter:
+    """
+    Applies an `EmissionPolicy` to the values of one observable property (of one channel)
+    """
+
+    __policy: EmissionPolicy
+    __last_values: Optional[Tuple[float, ...]]
+    __last_time: Optional[float]
+    __suppressed: int
+
+    def __init__(self, policy: EmissionPolicy = DEFAULT_EMISSION_POLICY) -> None:
+        if policy.absolute_tolerance < 0 or policy.relative_tolerance < 0:
+            raise ValueError(f"The tolerances must not be negative, got {policy}")
+        if policy.max_interval is not None and policy.max_interval < policy.min_interval:
+            raise ValueError(f"The maximum interval must not be shorter than the minimum interval, got {policy}")
+        self.__policy = policy
+        self.__last_values = None
+        self.__last_time = None
+        self.__suppressed = 0
+
+    @property
+    def policy(self) -> EmissionPolicy:
+        return self.__policy
+
+    @property
+    def suppressed(self) -> int:
+        """
+        The number of changed values that have not been sent because of the policy
+        """
+        return self.__suppressed
+
+    def accept(self, value: float, timestamp: float) -> bool:
+        """
+        Returns whether `value` (sampled at `timestamp` in seconds) should be sent, if so it becomes the last sent
+        value
+        """
+        return self.accept_all((value,), timestamp)
+
+    def accept_all(self, values: Sequence[float], timestamp: float) -> bool:
+        """
+        Like `accept` for a list of values (e.g. of all channels), which has changed if any of its values differs from
+        the respective last sent value by more than the deadband
+        """
+        last_values = self.__last_values
+        changed = (
+            last_values is None
+            or len(values) != len(last_values)
+            or any(self.__differs(value, last_value) for value, last_value in zip(values, last_values))
+        )
+        if self.__is_due(changed, timestamp):
+            self.__last_values = tuple(values)
+            self.__last_time = timestamp
+            return True
+        if changed:
+            self.__suppressed += 1
+        return False
+
+    def __differs(self, value: float, last_value: float) -> bool:
+        return not math.isclose(
+            value,
+            last_value,
+            rel_tol=self.__policy.relative_tolerance,
+            abs_tol=self.__policy.absolute_tolerance,
+        ) and not (math.isnan(value) and math.isnan(last_value))
+
+    def __is_due(self, changed: bool, timestamp: float) -> bool:
+        if self.__last_time is None:
+            return True
+        elapsed = timestamp - self.__last_time
+        if changed and elapsed >= self.__policy.min_interval:
+            return True
+        return self.__policy.max_interval is not None and elapsed >= self.__policy.max_interval
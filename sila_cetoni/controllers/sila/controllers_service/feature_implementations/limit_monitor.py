@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import math
+import time
+from enum import Enum
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .channel_poller import ChannelSample
+
+
+class LimitKind(Enum):
+    HIGH_LIMIT = "HighLimit"
+    """The actual value is above the high limit"""
+
+    LOW_LIMIT = "LowLimit"
+    """The actual value is below the low limit"""
+
+    DEVIATION = "Deviation"
+    """The actual value has deviated from the set point by more than the maximum deviation for the hold time"""
+
+    RATE_OF_CHANGE = "RateOfChange"
+    """The actual value has changed faster than the maximum rate of change between two samples"""
+
+
+class ChannelLimits(NamedTuple):
+    """
+    The limits of a controller channel (see `SetChannelLimits`)
+    """
+
+    high_limit: float = math.nan  # NaN disables the limit
+    low_limit: float = math.nan  # NaN disables the limit
+    max_deviation: float = 0  # 0 disables the limit
+    deviation_hold_time: float = 0
+    max_rate_of_change: float = 0  # 0 disables the limit
+
+    @property
+    def is_enabled(self) -> bool:
+        return (
+            not math.isnan(self.high_limit)
+            or not math.isnan(self.low_limit)
+            or self.max_deviation > 0
+            or self.max_rate_of_change > 0
+        )
+
+
+class LimitViolation(NamedTuple):
+    """
+    An active violation of a limit of a controller channel
+    """
+
+    channel_index: int
+    kind: LimitKind
+    value: float  # the value that has started the violation
+    limit: float
+    start_time: float  # timestamp of the sample that has started the violation
+
+
+class LimitViolationEvent(NamedTuple):
+    """
+    The start or the end of a `LimitViolation`
+    """
+
+    violation: LimitViolation
+    is_active: bool  # whether the violation has started (or ended)
+    timestamp: float  # timestamp of the sample that has started or ended the violation
+
+
+class LimitMonitor:
+    """
+    Checks the polled samples of all channels against the limits of each channel
+
+    `evaluate` is called with the samples of every sweep of the `ChannelPoller`, keeps the violations that are
+    currently active and returns an event for every violation that has started or ended, so only these events have to
+    be sent to the clients instead of every sample. Channels without limits cost a single list lookup per sample.
+    """
+
+    __limits: List[Optional[ChannelLimits]]  # one item per channel, `None` if the channel has no limits
+    __previous_samples: List[Optional[Tuple[float, float]]]  # (timestamp, actual value) of the last sample per channel
+    __deviation_start_times: List[Optional[float]]  # since when the deviation of each channel exceeds its limit
+    __violations: Dict[Tuple[int, LimitKind], LimitViolation]
+    __lock: Lock
+
+    def __init__(self, channel_count: int) -> None:
+        self.__limits = [None] * channel_count
+        self.__previous_samples = [None] * channel_count
+        self.__deviation_start_times = [None] * channel_count
+        self.__violations = {}
+        self.__lock = Lock()
+
+    def limits(self, channel_index: int) -> ChannelLimits:
+        return self.__limits[channel_index] or ChannelLimits()
+
+    def set_limits(self, channel_index: int, limits: ChannelLimits) -> List[LimitViolationEvent]:
+        """
+        Replaces the limits of the channel with the given index and ends the active violations of that channel
+
+        Returns
+        -------
+        List[LimitViolationEvent]
+            The ends of the violations of the channel that have been active
+        """
+        if limits.high_limit < limits.low_limit:
+            raise ValueError(f"The low limit {limits.low_limit} is greater than the high limit {limits.high_limit}")
+        with self.__lock:
+            self.__limits[channel_index] = limits if limits.is_enabled else None
+            self.__previous_samples[channel_index] = None
+            self.__deviation_start_times[channel_index] = None
+            now = time.time()
+            ended = [key for key in self.__violations if key[0] == channel_index]
+            return [LimitViolationEvent(self.__violations.pop(key), False, now) for key in ended]
+
+    @property
+    def violations(self) -> List[LimitViolation]:
+        """
+        The active violations of all channels ordered by channel index
+        """
+        with self.__lock:
+            return sorted(self.__violations.values(), key=lambda violation: violation.channel_index)
+
+    def evaluate(self, samples: List[ChannelSample]) -> List[LimitViolationEvent]:
+        """
+        Checks the given samples against the limits of their channels
+
+        Returns
+        -------
+        List[LimitViolationEvent]
+            The starts and ends of violations in the order of the samples (`violations` has only changed if there are any)
+        """
+        events: List[LimitViolationEvent] = []
+        with self.__lock:
+            for sample in samples:
+                i = sample.channel_index
+                limits = self.__limits[i]
+                if limits is None:
+                    continue
+                value = sample.actual_value
+
+                self.__update(
+                    events, i, LimitKind.HIGH_LIMIT, value > limits.high_limit, sample, value, limits.high_limit
+                )
+                self.__update(events, i, LimitKind.LOW_LIMIT, value < limits.low_limit, sample, value, limits.low_limit)
+
+                if limits.max_deviation > 0:
+                    deviation = value - sample.set_point
+                    if abs(deviation) > limits.max_deviation:
+                        if self.__deviation_start_times[i] is None:
+                            self.__deviation_start_times[i] = sample.timestamp
+                        is_violated = sample.timestamp - self.__deviation_start_times[i] >= limits.deviation_hold_time
+                    else:
+                        self.__deviation_start_times[i] = None
+                        is_violated = False
+                    self.__update(events, i, LimitKind.DEVIATION, is_violated, sample, deviation, limits.max_deviation)
+
+                if limits.max_rate_of_change > 0:
+                    previous = self.__previous_samples[i]
+                    self.__previous_samples[i] = (sample.timestamp, value)
+                    if previous is not None and sample.timestamp > previous[0]:
+                        rate = (value - previous[1]) / (sample.timestamp - previous[0])
+                        self.__update(
+                            events,
+                            i,
+                            LimitKind.RATE_OF_CHANGE,
+                            abs(rate) > limits.max_rate_of_change,
+                            sample,
+                            rate,
+                            limits.max_rate_of_change,
+                        )
+        return events
+
+    def __update(
+        self,
+        events: List[LimitViolationEvent],
+        channel_index: int,
+        kind: LimitKind,
+        is_violated: bool,
+        sample: ChannelSample,
+        value: float,
+        limit: float,
+    ) -> None:
+        """
+        Starts or ends the violation of the given kind and appends the start or the end to `events`
+        """
+        key = (channel_index, kind)
+        if is_violated:
+            if key not in self.__violations:
+                violation = LimitViolation(channel_index, kind, value, limit, sample.timestamp)
+                self.__violations[key] = violation
+                events.append(LimitViolationEvent(violation, True, sample.timestamp))
+        else:
+            violation = self.__violations.pop(key, None)
+            if violation is not None:
+                events.append(LimitViolationEvent(violation, False, sample.timestamp))
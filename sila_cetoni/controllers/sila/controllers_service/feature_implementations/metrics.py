@@ -0,0 +1,272 @@
+"""
+Metrics of the ControlLoopService in the Prometheus text format
+
+`ServiceMetrics` collects command latency histograms and the timing of the `ChannelPoller` while the server is
+running. All other values (e.g. queue depths) are only read from the respective objects by collector functions when
+the metrics are requested, so they cost nothing in between. The metrics are available as a dictionary
+(`ServiceMetrics.snapshot`), as Prometheus text (`ServiceMetrics.to_prometheus`) and from an HTTP endpoint
+(`ServiceMetrics.serve`).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0)
+"""Upper bounds of the histogram buckets in seconds"""
+
+METRIC_PREFIX = "controlloopservice_"
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Dict[str, str]
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    type: str  # "counter", "gauge" or "histogram"
+    help: str
+    samples: List[Sample]
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class Histogram:
+    """
+    A thread-safe histogram with fixed bucket bounds
+    """
+
+    __bounds: Tuple[float, ...]
+    __counts: List[int]  # per bucket (not cumulative), the last one for values above all bounds
+    __sum: float
+    __lock: Lock
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.__bounds = tuple(sorted(bounds))
+        self.__counts = [0] * (len(self.__bounds) + 1)
+        self.__sum = 0.0
+        self.__lock = Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.__bounds, value)
+        with self.__lock:
+            self.__counts[i] += 1
+            self.__sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.__counts)
+
+    def samples(self, name: str, labels: Dict[str, str]) -> List[Sample]:
+        """
+        Returns the cumulative `_bucket` samples and the `_sum` and `_count` samples of this histogram
+        """
+        with self.__lock:
+            counts = list(self.__counts)
+            total = self.__sum
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.__bounds + (math.inf,), counts):
+            cumulative += count
+            samples.append(Sample(f"{name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+        samples.append(Sample(f"{name}_sum", labels, total))
+        samples.append(Sample(f"{name}_count", labels, cumulative))
+        return samples
+
+
+class _CommandTimer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class ServiceMetrics:
+    """
+    The metrics of a ControlLoopService
+    """
+
+    __command_histograms: Dict[Tuple[str, int], Histogram]
+    __sweep_histogram: Histogram
+    __jitter_histogram: Histogram
+    __collectors: List[Collector]
+    __lock: Lock
+    __http_server: Optional[ThreadingHTTPServer]
+
+    def __init__(self) -> None:
+        self.__command_histograms = {}
+        self.__sweep_histogram = Histogram()
+        self.__jitter_histogram = Histogram()
+        self.__collectors = []
+        self.__lock = Lock()
+        self.__http_server = None
+
+    def time_command(self, command: str, channel_index: int) -> _CommandTimer:
+        """
+        Returns a context manager that records the duration of its block as the latency of `command` on the channel
+        with the given index
+        """
+        key = (command, channel_index)
+        histogram = self.__command_histograms.get(key)
+        if histogram is None:
+            with self.__lock:
+                histogram = self.__command_histograms.setdefault(key, Histogram())
+        return _CommandTimer(histogram)
+
+    def observe_sweep(self, duration: float, jitter: float) -> None:
+        """
+        Records the duration and the start delay of a sweep of the `ChannelPoller`
+        """
+        self.__sweep_histogram.observe(duration)
+        self.__jitter_histogram.observe(jitter)
+
+    def add_collector(self, collector: Collector) -> None:
+        """
+        Registers a function that returns additional metric families whenever the metrics are requested
+        """
+        with self.__lock:
+            self.__collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        with self.__lock:
+            command_histograms = sorted(self.__command_histograms.items())
+            collectors = list(self.__collectors)
+
+        name = METRIC_PREFIX + "command_duration_seconds"
+        families = [
+            MetricFamily(
+                name,
+                "histogram",
+                "Duration of the ControlLoopService commands per channel",
+                [
+                    sample
+                    for (command, channel_index), histogram in command_histograms
+                    for sample in histogram.samples(name, {"command": command, "channel": str(channel_index)})
+                ],
+            ),
+            MetricFamily(
+                METRIC_PREFIX + "poll_sweep_duration_seconds",
+                "histogram",
+                "Duration of the sweeps of the channel poller",
+                self.__sweep_histogram.samples(METRIC_PREFIX + "poll_sweep_duration_seconds", {}),
+            ),
+            MetricFamily(
+                METRIC_PREFIX + "poll_sweep_jitter_seconds",
+                "histogram",
+                "Delay of the start of the sweeps of the channel poller",
+                self.__jitter_histogram.samples(METRIC_PREFIX + "poll_sweep_jitter_seconds", {}),
+            ),
+        ]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                logger.error(f"Metrics collector {collector!r} failed", exc_info=True)
+        return families
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns all metrics as a dictionary that can be serialized as JSON, e.g.
+        `{"controlloopservice_poll_overruns_total": {"type": "counter", "help": "...", "samples": [...]}}`
+        """
+        return {
+            family.name: {
+                "type": family.type,
+                "help": family.help,
+                "samples": [{"name": s.name, "labels": s.labels, "value": s.value} for s in family.samples],
+            }
+            for family in self.collect()
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns all metrics in the Prometheus text exposition format
+        """
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                if sample.labels:
+                    labels = ",".join(f'{key}="{_escape(value)}"' for key, value in sample.labels.items())
+                    lines.append(f"{sample.name}{{{labels}}} {_format_value(sample.value)}")
+                else:
+                    lines.append(f"{sample.name} {_format_value(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serves the metrics in the Prometheus text format at `http://<host>:<port>/metrics` in a background thread
+        """
+        if self.__http_server is not None:
+            raise RuntimeError("The metrics are already being served")
+        metrics = self
+
+        class _MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug(format % args)
+
+        self.__http_server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+        self.__http_server.daemon_threads = True
+        Thread(target=self.__http_server.serve_forever, name="MetricsHTTPServer", daemon=True).start()
+        logger.info(f"Serving metrics at http://{host}:{self.__http_server.server_address[1]}/metrics")
+
+    @property
+    def port(self) -> Optional[int]:
+        """
+        The port the metrics are served at (see `serve`)
+        """
+        return None if self.__http_server is None else self.__http_server.server_address[1]
+
+    def shutdown(self) -> None:
+        """
+        Stops serving the metrics
+        """
+        if self.__http_server is not None:
+            self.__http_server.shutdown()
+            self.__http_server.server_close()
+            self.__http_server = None
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections import deque
+from queue import Queue
+from typing import Deque, Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+class RingBufferQueue(Queue, Generic[_T]):
+    """
+    A `Queue` with a fixed capacity that never blocks the producer
+
+    If the queue is full the oldest item is discarded in favour of the new one (latest value wins) and the number of
+    dropped items is counted.
+
+    This is meant to buffer the values of an observable property for a subscriber (see `SubscriberStream`): An
+    unbounded queue grows forever as long as a subscriber does not keep up, and after a subscriber has lagged behind,
+    stale values would be sent before the current one.
+    """
+
+    queue: Deque[_T]
+    __dropped: int
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        maxsize: int
+            The maximum number of buffered items (must be at least 1)
+        """
+        if maxsize < 1:
+            raise ValueError(f"The buffer size must be at least 1, got {maxsize}")
+        self.__dropped = 0
+        # the base class must not enforce `maxsize` itself or `put` would block
+        super().__init__(maxsize=0)
+        self.queue = deque(maxlen=maxsize)
+
+    @property
+    def capacity(self) -> int:
+        return self.queue.maxlen
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of items that have been discarded because the queue was full
+        """
+        return self.__dropped
+
+    def _init(self, maxsize: int) -> None:
+        # replaced in `__init__` as soon as the capacity is known
+        self.queue = deque()
+
+    def _put(self, item: _T) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.__dropped += 1
+        self.queue.append(item)
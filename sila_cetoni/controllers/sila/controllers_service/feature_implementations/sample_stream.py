@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from threading import Condition
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .channel_history import pack_samples
+
+if TYPE_CHECKING:
+    from .channel_poller import ChannelSample
+
+
+class SampleBlockBuffer:
+    """
+    Collects the polled samples of some channels into blocks of packed samples (see `StreamSamples`)
+
+    `add` is registered as a listener of the `ChannelPoller` and only appends the samples of the streamed channels.
+    `take_blocks` waits until one of the channels has collected `block_size` samples or the oldest collected sample is
+    `max_latency` seconds old and then returns the collected samples of all channels packed with `pack_samples`, so a
+    consumer gets one message per `block_size` samples instead of one message per sample.
+
+    If the consumer can't keep up, at most `max_pending_blocks` blocks are kept per channel and the oldest samples are
+    dropped (see `dropped`).
+    """
+
+    __block_size: int
+    __max_latency: float
+    __pending: Dict[int, Deque[Tuple[float, float, float]]]  # channel index -> collected samples
+    __oldest: Optional[float]  # time (`time.monotonic`) at which the oldest collected sample has been added
+    __is_full: bool  # whether any channel has collected `block_size` samples
+    __is_closed: bool
+    __dropped: int
+    __condition: Condition
+
+    def __init__(
+        self, channel_indices: Iterable[int], block_size: int, max_latency: float, max_pending_blocks: int = 16
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        channel_indices: Iterable[int]
+            The indices of the channels whose samples are collected
+        block_size: int
+            The number of samples of a channel after which the collected samples are returned
+        max_latency: float
+            The longest time in seconds a sample is held back to fill a block
+        max_pending_blocks: int (default: 16)
+            The maximum number of blocks per channel that are kept while the consumer is not taking them
+        """
+        if block_size < 1:
+            raise ValueError(f"The block size must be at least 1, got {block_size}")
+        if max_latency <= 0:
+            raise ValueError(f"The maximum latency must be positive, got {max_latency}")
+        self.__block_size = block_size
+        self.__max_latency = max_latency
+        self.__pending = {i: deque(maxlen=block_size * max_pending_blocks) for i in channel_indices}
+        self.__oldest = None
+        self.__is_full = False
+        self.__is_closed = False
+        self.__dropped = 0
+        self.__condition = Condition()
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of samples that have been dropped because the consumer did not keep up
+        """
+        return self.__dropped
+
+    @property
+    def is_closed(self) -> bool:
+        return self.__is_closed
+
+    def add(self, samples: List[ChannelSample]) -> None:
+        with self.__condition:
+            if self.__is_closed:
+                return
+            added = False
+            for sample in samples:
+                pending = self.__pending.get(sample.channel_index)
+                if pending is None:
+                    continue
+                if len(pending) == pending.maxlen:
+                    self.__dropped += 1
+                pending.append((sample.timestamp, sample.actual_value, sample.set_point))
+                added = True
+                if len(pending) >= self.__block_size:
+                    self.__is_full = True
+            if added and self.__oldest is None:
+                # `take_blocks` has to wait for `max_latency` from now at most
+                self.__oldest = time.monotonic()
+                self.__condition.notify_all()
+            elif self.__is_full:
+                self.__condition.notify_all()
+
+    def take_blocks(self, timeout: float = math.inf) -> List[Tuple[int, bytes]]:
+        """
+        Waits at most `timeout` seconds for a block to be complete (see above)
+
+        Returns
+        -------
+        List[Tuple[int, bytes]]
+            The channel index and the packed samples of every channel that has collected samples (empty if no block
+            has been completed within `timeout`)
+        """
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            while not (self.__is_full or self.__is_closed):
+                now = time.monotonic()
+                if self.__oldest is not None and now >= self.__oldest + self.__max_latency:
+                    break
+                wait_until = deadline if self.__oldest is None else min(deadline, self.__oldest + self.__max_latency)
+                if now >= deadline:
+                    return []
+                self.__condition.wait(wait_until - now if wait_until < math.inf else None)
+            return self.__take()
+
+    def flush(self) -> List[Tuple[int, bytes]]:
+        """
+        Returns the collected samples of all channels right away (like `take_blocks`)
+        """
+        with self.__condition:
+            return self.__take()
+
+    def close(self) -> None:
+        """
+        Stops collecting samples and wakes up `take_blocks`
+        """
+        with self.__condition:
+            self.__is_closed = True
+            self.__condition.notify_all()
+
+    def __take(self) -> List[Tuple[int, bytes]]:
+        blocks = []
+        for channel_index, pending in self.__pending.items():
+            if pending:
+                blocks.append((channel_index, pack_samples(np.array(pending))))
+                pending.clear()
+        self.__oldest = None
+        self.__is_full = False
+        return blocks
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import math
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+if TYPE_CHECKING:
+    from qmixsdk.qmixcontroller import ControllerChannel
+
+
+class SerializedControllerChannel:
+    """
+    Wraps a controller channel so that all calls to it are serialized and set point writes are coalesced
+
+    Every call to the channel (reads from the poller as well as writes from the command handlers) holds the channel's
+    I/O lock, so there is never more than one call per channel on the bus. Instead of running a thread per channel,
+    the calling threads take turns: A set point that is written while another write to the channel is in progress
+    only replaces the pending set point. The next thread that gets the I/O lock writes the latest pending set point
+    for all threads that are waiting, i.e. a burst of writes (e.g. from a slider in a UI) ends up as at most two
+    writes on the bus (last writer wins). `write_setpoint` returns once the set point or a newer one has been written
+    and raises the error of the write that should have written it, if any. Since there is at most one pending write,
+    reads have to wait for at most one write.
+
+    Additionally, `min_write_interval` limits the rate of set point writes per channel. Writes that arrive earlier
+    wait and are coalesced with later ones.
+
+    If a `set_point_reconcile_interval` is given, the set point is cached: The set point of a channel only changes when
+    it is written through this wrapper (or, rarely, by someone else), so `get_setpoint` returns the last written or read
+    set point and only reads it from the channel again if it is older than `set_point_reconcile_interval` (to pick up
+    changes made by others). Writes of the cached set point are skipped. If a write fails, the set point is read from
+    the channel the next time.
+    """
+
+    __channel: ControllerChannel
+    __min_write_interval: float
+    __io_lock: Lock  # held during every call to `__channel`
+    __state_lock: Lock  # protects the pending write and the write results
+    __pending: Optional[Tuple[int, float]]  # (sequence number, set point) of the latest write that is not done yet
+    __last_sequence_number: int
+    __written_sequence_number: int  # sequence number of the latest successful write
+    __error: Optional[Tuple[int, Exception]]  # sequence number and error of the latest failed write
+    __last_write_time: float
+    __bus_writes: int
+    __coalesced_writes: int
+    __set_point_reconcile_interval: Optional[float]
+    __cached_set_point: Optional[float]  # protected by `__io_lock`
+    __cache_time: float  # time of the last write or read of `__cached_set_point`
+    __cache_hits: int
+    __skipped_writes: int
+
+    def __init__(
+        self,
+        channel: ControllerChannel,
+        min_write_interval: float = 0,
+        set_point_reconcile_interval: Optional[float] = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        channel: ControllerChannel
+            The channel to wrap
+        min_write_interval: float (default: 0)
+            The minimum time between two set point writes to the channel in seconds
+        set_point_reconcile_interval: float (optional)
+            The time in seconds after which a cached set point is read from the channel again, if not given the set
+            point is not cached
+        """
+        self.__channel = channel
+        self.__min_write_interval = min_write_interval
+        self.__io_lock = Lock()
+        self.__state_lock = Lock()
+        self.__pending = None
+        self.__last_sequence_number = 0
+        self.__written_sequence_number = 0
+        self.__error = None
+        self.__last_write_time = -math.inf
+        self.__bus_writes = 0
+        self.__coalesced_writes = 0
+        self.__set_point_reconcile_interval = set_point_reconcile_interval
+        self.__cached_set_point = None
+        self.__cache_time = -math.inf
+        self.__cache_hits = 0
+        self.__skipped_writes = 0
+
+    @property
+    def channel(self) -> ControllerChannel:
+        """
+        The wrapped channel
+        """
+        return self.__channel
+
+    @property
+    def bus_writes(self) -> int:
+        """
+        The number of set point writes that have been sent to the channel
+        """
+        return self.__bus_writes
+
+    @property
+    def coalesced_writes(self) -> int:
+        """
+        The number of set point writes that have been replaced by a newer set point before they were sent
+        """
+        return self.__coalesced_writes
+
+    @property
+    def cache_hits(self) -> int:
+        """
+        The number of `get_setpoint` calls that have been answered from the set point cache
+        """
+        return self.__cache_hits
+
+    @property
+    def skipped_writes(self) -> int:
+        """
+        The number of set point writes that have been skipped because the channel already had the set point
+        """
+        return self.__skipped_writes
+
+    def write_setpoint(self, set_point: float) -> None:
+        with self.__state_lock:
+            self.__last_sequence_number += 1
+            sequence_number = self.__last_sequence_number
+            if self.__pending is not None:
+                self.__coalesced_writes += 1
+            self.__pending = (sequence_number, set_point)
+
+        delay = self.__last_write_time + self.__min_write_interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        with self.__io_lock:
+            with self.__state_lock:
+                if self.__written_sequence_number >= sequence_number:
+                    # written by another thread in the meantime
+                    return
+                if self.__error is not None and self.__error[0] >= sequence_number:
+                    raise self.__error[1]
+                write_sequence_number, write_set_point = self.__pending
+                self.__pending = None
+                if self.__is_cached(write_set_point):
+                    self.__skipped_writes += 1
+                    self.__written_sequence_number = write_sequence_number
+                    return
+            try:
+                self.__channel.write_setpoint(write_set_point)
+            except Exception as err:
+                self.__cached_set_point = None
+                with self.__state_lock:
+                    self.__error = (write_sequence_number, err)
+                raise
+            finally:
+                self.__last_write_time = time.monotonic()
+                self.__bus_writes += 1
+            self.__cache(write_set_point)
+            with self.__state_lock:
+                self.__written_sequence_number = write_sequence_number
+
+    def get_setpoint(self) -> float:
+        with self.__io_lock:
+            if self.__cached_set_point is not None and self.__is_fresh():
+                self.__cache_hits += 1
+                return self.__cached_set_point
+            set_point = self.__channel.get_setpoint()
+            self.__cache(set_point)
+            return set_point
+
+    def read_actual_value(self) -> float:
+        with self.__io_lock:
+            return self.__channel.read_actual_value()
+
+    def enable_control_loop(self, enable: bool) -> None:
+        with self.__io_lock:
+            self.__channel.enable_control_loop(enable)
+
+    def __is_fresh(self) -> bool:
+        return (
+            self.__set_point_reconcile_interval is not None
+            and time.monotonic() - self.__cache_time < self.__set_point_reconcile_interval
+        )
+
+    def __is_cached(self, set_point: float) -> bool:
+        return self.__cached_set_point == set_point and self.__is_fresh()
+
+    def __cache(self, set_point: float) -> None:
+        if self.__set_point_reconcile_interval is not None:
+            self.__cached_set_point = set_point
+            self.__cache_time = time.monotonic()
+
+    def __getattr__(self, name: str) -> Any:
+        # all other methods of the channel are serialized as well
+        if name.startswith(f"_{SerializedControllerChannel.__name__}__"):
+            raise AttributeError(name)
+        attribute = getattr(self.__channel, name)
+        if not callable(attribute):
+            return attribute
+
+        def serialized(*args, **kwargs):
+            with self.__io_lock:
+                return attribute(*args, **kwargs)
+
+        return serialized
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__channel!r})"
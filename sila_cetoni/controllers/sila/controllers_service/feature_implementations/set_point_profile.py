@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from enum import Enum
+from typing import Iterable, List, Optional, Tuple
+
+
+class ProfileInterpolation(Enum):
+    """
+    How the set point of a `SetPointProfile` changes between two points
+    """
+
+    LINEAR = "Linear"
+    """The set point is ramped linearly from one point to the next"""
+
+    STEP = "Step"
+    """The set point of a point is held until the time of the next point"""
+
+
+class SetPointProfile:
+    """
+    A set point profile given as a list of `(time, set_point)` points
+
+    The times are in seconds relative to the start of the profile and must not decrease, the times and set points must
+    be finite. Before the first point the set
+    point of the first point is used, after the last point the profile is finished.
+    """
+
+    __times: List[float]
+    __set_points: List[float]
+    __interpolation: ProfileInterpolation
+
+    def __init__(
+        self, points: Iterable[Tuple[float, float]], interpolation: ProfileInterpolation = ProfileInterpolation.LINEAR
+    ):
+        """
+        Constructor
+
+        Parameters
+        ----------
+        points: Iterable[Tuple[float, float]]
+            The `(time, set_point)` points of the profile
+        interpolation: ProfileInterpolation (default: ProfileInterpolation.LINEAR)
+            How to interpolate the set point between two points
+
+        Raises
+        ------
+        ValueError
+            If `points` is empty, contains a negative or non-finite time, times that decrease or a non-finite set point
+        """
+        points = list(points)
+        if not points:
+            raise ValueError("The profile must contain at least one point")
+        self.__times = [float(t) for t, _ in points]
+        self.__set_points = [float(set_point) for _, set_point in points]
+        for t, set_point in zip(self.__times, self.__set_points):
+            # a NaN set point would differ from the set point of the channel in every tick and be written every time
+            if not math.isfinite(t) or not math.isfinite(set_point):
+                raise ValueError(f"The times and set points of the profile must be finite, got ({t}, {set_point})")
+        if self.__times[0] < 0:
+            raise ValueError(f"The times of the profile must not be negative, got {self.__times[0]}")
+        for i in range(1, len(self.__times)):
+            if self.__times[i] < self.__times[i - 1]:
+                raise ValueError(
+                    f"The times of the profile must not decrease, got {self.__times[i]} after {self.__times[i - 1]}"
+                )
+        self.__interpolation = interpolation
+
+    @property
+    def interpolation(self) -> ProfileInterpolation:
+        return self.__interpolation
+
+    @property
+    def duration(self) -> float:
+        """
+        The time of the last point of the profile in seconds
+        """
+        return self.__times[-1]
+
+    def set_point_at(self, t: float) -> float:
+        """
+        Returns the set point of the profile at the time `t` (in seconds relative to the start of the profile)
+        """
+        i = bisect_right(self.__times, t)
+        if i == 0:
+            return self.__set_points[0]
+        if i == len(self.__times) or self.__interpolation is ProfileInterpolation.STEP:
+            return self.__set_points[i - 1]
+        t0, t1 = self.__times[i - 1], self.__times[i]
+        y0, y1 = self.__set_points[i - 1], self.__set_points[i]
+        return y0 + (y1 - y0) * (t - t0) / (t1 - t0)
+
+    def next_change_after(self, t: float) -> Optional[float]:
+        """
+        Returns the time of the next point after `t` or `None` if there is none
+
+        For a step profile this is the next time at which the set point changes.
+        """
+        i = bisect_right(self.__times, t)
+        return self.__times[i] if i < len(self.__times) else None
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+from .ring_buffer_queue import RingBufferQueue
+
+if TYPE_CHECKING:
+    from grpc import ServicerContext
+    from sila2.server import SilaServer
+
+_T = TypeVar("_T")
+
+_END = object()  # put into a `SubscriberStream` when it is cancelled
+
+
+class SubscriberStream(Iterator[Any]):
+    """
+    The values of an observable property that have not been sent to one subscriber yet
+
+    The values are buffered in a `RingBufferQueue`, so a subscriber that does not keep up only gets the latest
+    `capacity` values and the number of values that have been dropped for it is counted.
+    """
+
+    __queue: RingBufferQueue[Any]
+    __is_alive: bool
+    peer: str  # the address of the subscriber
+
+    def __init__(self, capacity: int, peer: str) -> None:
+        self.__queue = RingBufferQueue(capacity)
+        self.__is_alive = True
+        self.peer = peer
+
+    @property
+    def is_alive(self) -> bool:
+        return self.__is_alive
+
+    @property
+    def backlog(self) -> int:
+        """
+        The number of values that are waiting to be sent
+        """
+        return self.__queue.qsize()
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of values that have been dropped because the subscriber did not keep up
+        """
+        return self.__queue.dropped
+
+    def put(self, item: Any) -> None:
+        if self.__is_alive:
+            self.__queue.put(item)
+
+    def cancel(self) -> None:
+        if self.__is_alive:
+            self.__is_alive = False
+            # the end marker is the newest item, so it is never dropped
+            self.__queue.put(_END)
+
+    def __next__(self) -> Any:
+        item = self.__queue.get()
+        if item is _END:
+            raise StopIteration
+        return item
+
+
+class SubscriptionFanout(Generic[_T]):
+    """
+    Sends the values of an observable property to all of its subscribers
+
+    This is used instead of a producer queue of the observable property (i.e. it is passed as `queue` to the
+    `update_...` methods and returned from the `..._on_subscription` methods) and replaces the
+    `SubscriptionManagerThread` that sila2 would start for that queue (see `register`): Instead of a thread per queue
+    that copies every value into an unbounded stream per subscriber, `put` converts a value once and puts it into the
+    bounded `SubscriberStream` of every subscriber right away. A new subscriber only gets the latest value (or nothing
+    for properties whose values are events, see `send_latest`).
+    """
+
+    __property_identifier: str
+    __converter: Callable[[_T], Any]
+    __capacity: int
+    __send_latest: bool
+    __subscribers: List[SubscriberStream]
+    __last_item: Optional[_T]
+    __dropped: int  # values dropped for subscribers that have already been cancelled
+    __lock: Lock
+
+    def __init__(
+        self, property_identifier: str, converter: Callable[[_T], Any], capacity: int, send_latest: bool = True
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        property_identifier: str
+            The identifier of the observable property
+        converter: Callable
+            Converts a value to the message that is sent to the subscribers (`ObservableProperty.to_message`)
+        capacity: int
+            The maximum number of values that are buffered per subscriber
+        send_latest: bool (default: True)
+            Whether a new subscriber gets the latest value first, `False` if every value should only be sent once
+            (e.g. events)
+        """
+        if capacity < 1:
+            raise ValueError(f"The buffer size must be at least 1, got {capacity}")
+        self.__property_identifier = property_identifier
+        self.__converter = converter
+        self.__capacity = capacity
+        self.__send_latest = send_latest
+        self.__subscribers = []
+        self.__last_item = None
+        self.__dropped = 0
+        self.__lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def subscribers(self) -> List[SubscriberStream]:
+        with self.__lock:
+            return list(self.__subscribers)
+
+    def qsize(self) -> int:
+        """
+        The largest number of values that are waiting to be sent to a subscriber
+        """
+        return max((subscriber.backlog for subscriber in self.subscribers), default=0)
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of values that have been dropped for all (current and former) subscribers
+        """
+        with self.__lock:
+            return self.__dropped + sum(subscriber.dropped for subscriber in self.__subscribers)
+
+    def register(self, server: SilaServer, feature_identifier: str) -> None:
+        """
+        Makes the SiLA server use this object instead of a `SubscriptionManagerThread` for the subscriptions that get
+        this object as their queue from `..._on_subscription` (has to be called before it is returned)
+        """
+        servicer = server.feature_servicers[feature_identifier]
+        managers: Dict[Any, Any] = servicer.observable_property_subscription_managers[self.__property_identifier]
+        managers.setdefault(self, self)
+
+    def put(self, item: _T) -> None:
+        """
+        Sends `item` to all subscribers (never blocks)
+        """
+        with self.__lock:
+            self.__last_item = item
+            if self.__subscribers:
+                message = self.__convert(item)
+                for subscriber in self.__subscribers:
+                    subscriber.put(message)
+
+    def add_subscription(self, context: ServicerContext) -> SubscriberStream:
+        """
+        Called by the SiLA server for every new subscription
+        """
+        subscriber = SubscriberStream(self.__capacity, context.peer())
+        with self.__lock:
+            # send the latest value so that the client gets the current value immediately
+            if self.__send_latest and self.__last_item is not None:
+                subscriber.put(self.__convert(self.__last_item))
+            self.__subscribers.append(subscriber)
+        context.add_callback(lambda: self.cancel_subscription(subscriber))
+        return subscriber
+
+    def cancel_subscription(self, subscriber: SubscriberStream) -> None:
+        subscriber.cancel()
+        with self.__lock:
+            if subscriber in self.__subscribers:
+                self.__subscribers.remove(subscriber)
+                self.__dropped += subscriber.dropped
+
+    def cancel_producer(self) -> None:
+        """
+        Called by the SiLA server when it stops, ends all subscriptions
+        """
+        for subscriber in self.subscribers:
+            self.cancel_subscription(subscriber)
+
+    def __convert(self, item: _T) -> Any:
+        # errors (see `abort_..._subscriptions`) are raised by the SiLA server as they are
+        return item if isinstance(item, BaseException) else self.__converter(item)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__property_identifier!r}, capacity={self.__capacity})"
@@ -0,0 +1,290 @@
+"""
+Recording of the polled controller values into memory-mapped segment files
+
+A segment file consists of a header of `HEADER_SIZE` bytes followed by a preallocated array of fixed-width records of
+type `RECORD_DTYPE`. The header contains the magic bytes `MAGIC`, the record size, the capacity of the segment and the
+number of valid records. Since the records are written before the record count in the header is increased, a reader
+never sees partially written records.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import time
+from enum import Enum
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .channel_poller import ChannelSample
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CTRACE01"
+
+RECORD_DTYPE = np.dtype(
+    [("timestamp", "<f8"), ("channel", "<u4"), ("actual_value", "<f8"), ("set_point", "<f8")], align=False
+)
+"""A record of a segment file: timestamp in seconds since the epoch, channel index, actual value and set point"""
+
+HEADER_SIZE = 64
+_HEADER_FORMAT = "<8sIQQ"  # magic, record size, capacity, record count
+_RECORD_COUNT_OFFSET = struct.calcsize("<8sIQ")
+
+SEGMENT_SUFFIX = ".ctrace"
+
+
+class FsyncPolicy(Enum):
+    """
+    When the recorded data is explicitly flushed to the disk
+    """
+
+    NEVER = "never"
+    """Leave it to the operating system"""
+
+    ROTATE = "rotate"
+    """When a segment file is full or the recorder is stopped"""
+
+    INTERVAL = "interval"
+    """Every `fsync_interval` seconds and when a segment file is full or the recorder is stopped"""
+
+
+class _Segment:
+    """
+    An open segment file that records are appended to
+    """
+
+    path: Path
+    records: np.ndarray
+    count: int
+    __file: BinaryIO
+    __mmap: mmap.mmap
+
+    def __init__(self, path: Path, capacity: int) -> None:
+        self.path = path
+        self.count = 0
+        size = HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+        with open(path, "wb") as f:
+            f.truncate(size)
+        self.__file = open(path, "r+b")
+        self.__mmap = mmap.mmap(self.__file.fileno(), size)
+        struct.pack_into(_HEADER_FORMAT, self.__mmap, 0, MAGIC, RECORD_DTYPE.itemsize, capacity, 0)
+        self.records = np.ndarray((capacity,), dtype=RECORD_DTYPE, buffer=self.__mmap, offset=HEADER_SIZE)
+
+    @property
+    def free(self) -> int:
+        return len(self.records) - self.count
+
+    def append(self, records: np.ndarray) -> None:
+        self.records[self.count : self.count + len(records)] = records
+        self.count += len(records)
+        struct.pack_into("<Q", self.__mmap, _RECORD_COUNT_OFFSET, self.count)
+
+    def flush(self) -> None:
+        self.__mmap.flush()
+        os.fsync(self.__file.fileno())
+
+    def close(self, fsync: bool) -> None:
+        if fsync:
+            self.flush()
+        # the array must not reference the mmap anymore, otherwise it cannot be closed
+        del self.records
+        self.__mmap.close()
+        self.__file.close()
+
+
+class TraceRecorder:
+    """
+    Appends the samples of the `ChannelPoller` to rotating memory-mapped segment files in `directory`
+
+    The samples are handed over to a background thread through a bounded queue (see `record`), so writing to the disk
+    never blocks the polling. If the writer cannot keep up and the queue is full, the samples of a sweep are dropped
+    and counted in `dropped_sweeps`.
+    """
+
+    __directory: Path
+    __segment_capacity: int
+    __fsync_policy: FsyncPolicy
+    __fsync_interval: float
+    __queue: "Queue[List[ChannelSample]]"
+    __stop_event: Event
+    __thread: Optional[Thread]
+    __segment: Optional[_Segment]
+    __segment_number: int
+    __dropped_sweeps: int
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        segment_capacity: int = 1_000_000,
+        fsync_policy: Union[FsyncPolicy, str] = FsyncPolicy.ROTATE,
+        fsync_interval: float = 10,
+        queue_size: int = 10_000,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        directory: str | os.PathLike
+            The directory for the segment files (created if it doesn't exist)
+        segment_capacity: int (default: 1000000)
+            The number of records per segment file (each record takes `RECORD_DTYPE.itemsize` bytes)
+        fsync_policy: FsyncPolicy | str (default: FsyncPolicy.ROTATE)
+            When to flush the recorded data to the disk
+        fsync_interval: float (default: 10)
+            The time between two flushes in seconds if `fsync_policy` is `FsyncPolicy.INTERVAL`
+        queue_size: int (default: 10000)
+            The maximum number of sweeps that may be waiting to be written
+        """
+        if segment_capacity < 1:
+            raise ValueError(f"The segment capacity must be at least 1, got {segment_capacity}")
+        self.__directory = Path(directory)
+        self.__segment_capacity = segment_capacity
+        self.__fsync_policy = FsyncPolicy(fsync_policy)
+        self.__fsync_interval = fsync_interval
+        self.__queue = Queue(queue_size)
+        self.__stop_event = Event()
+        self.__thread = None
+        self.__segment = None
+        self.__segment_number = 0
+        self.__dropped_sweeps = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.__directory
+
+    @property
+    def dropped_sweeps(self) -> int:
+        """
+        The number of sweeps that could not be recorded because the writer could not keep up
+        """
+        return self.__dropped_sweeps
+
+    def start(self) -> None:
+        if self.__thread is not None:
+            return
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__stop_event.clear()
+        self.__thread = Thread(target=self.__run, name=self.__class__.__name__, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Writes all pending samples, closes the current segment file and stops the background thread
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def record(self, samples: List[ChannelSample]) -> None:
+        """
+        Queues the samples of a sweep for writing (can be used as a listener of the `ChannelPoller`)
+        """
+        if not samples:
+            return
+        try:
+            self.__queue.put_nowait(samples)
+        except Full:
+            self.__dropped_sweeps += 1
+            if self.__dropped_sweeps == 1 or self.__dropped_sweeps % 1000 == 0:
+                logger.warning(f"The trace recorder cannot keep up, {self.__dropped_sweeps} sweep(s) dropped so far")
+
+    def __run(self) -> None:
+        last_flush = time.monotonic()
+        try:
+            while not (self.__stop_event.is_set() and self.__queue.empty()):
+                try:
+                    sweeps = [self.__queue.get(timeout=0.5)]
+                except Empty:
+                    sweeps = []
+                # write everything that is pending in one go
+                while True:
+                    try:
+                        sweeps.append(self.__queue.get_nowait())
+                    except Empty:
+                        break
+                if sweeps:
+                    self.__write([sample for sweep in sweeps for sample in sweep])
+
+                if (
+                    self.__fsync_policy is FsyncPolicy.INTERVAL
+                    and self.__segment is not None
+                    and time.monotonic() - last_flush >= self.__fsync_interval
+                ):
+                    self.__segment.flush()
+                    last_flush = time.monotonic()
+        except Exception:
+            logger.error("The trace recorder failed, no more samples will be recorded", exc_info=True)
+        finally:
+            if self.__segment is not None:
+                self.__segment.close(fsync=self.__fsync_policy is not FsyncPolicy.NEVER)
+                self.__segment = None
+
+    def __write(self, samples: List[ChannelSample]) -> None:
+        records = np.array(
+            [(s.timestamp, s.channel_index, s.actual_value, s.set_point) for s in samples], dtype=RECORD_DTYPE
+        )
+        while len(records):
+            if self.__segment is None or self.__segment.free == 0:
+                self.__rotate()
+            n = min(len(records), self.__segment.free)
+            self.__segment.append(records[:n])
+            records = records[n:]
+
+    def __rotate(self) -> None:
+        if self.__segment is not None:
+            self.__segment.close(fsync=self.__fsync_policy is not FsyncPolicy.NEVER)
+        self.__segment_number += 1
+        # UTC, so that the names don't jump back when the daylight saving time ends
+        path = self.__directory / (
+            f"trace-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{self.__segment_number:06d}{SEGMENT_SUFFIX}"
+        )
+        logger.debug(f"Recording controller values to {path}")
+        self.__segment = _Segment(path, self.__segment_capacity)
+
+
+def open_segment(path: Union[str, os.PathLike]) -> np.ndarray:
+    """
+    Maps the valid records of the segment file at `path` into memory without copying or parsing them
+
+    Returns
+    -------
+    np.ndarray
+        A read-only array of `RECORD_DTYPE` records (backed by the file)
+    """
+    with open(path, "rb") as f:
+        magic, record_size, capacity, count = struct.unpack(_HEADER_FORMAT, f.read(struct.calcsize(_HEADER_FORMAT)))
+    if magic != MAGIC or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a trace segment file")
+    if count == 0:
+        return np.empty((0,), dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def iter_segments(
+    directory: Union[str, os.PathLike], start_time: Optional[float] = None, end_time: Optional[float] = None
+) -> Iterator[np.ndarray]:
+    """
+    Yields the records of all segment files in `directory` in chronological order (see `open_segment`)
+
+    The segments are ordered by the timestamp of their first record, not by their file names, which depend on the
+    clock of the recording computer when the segment was created. If `start_time` and/or `end_time` are given, only
+    the records with a timestamp in this range are yielded (as views into the mapped files).
+    """
+    segments = [open_segment(path) for path in sorted(Path(directory).glob(f"*{SEGMENT_SUFFIX}"))]
+    segments = [records for records in segments if len(records) > 0]
+    segments.sort(key=lambda records: float(records["timestamp"][0]))
+    for records in segments:
+        timestamps = records["timestamp"]
+        first = 0 if start_time is None else np.searchsorted(timestamps, start_time, side="left")
+        last = len(records) if end_time is None else np.searchsorted(timestamps, end_time, side="right")
+        if first < last:
+            yield records[first:last]
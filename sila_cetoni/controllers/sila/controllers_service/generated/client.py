@@ -1,4 +1,4 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 from __future__ import annotations
 
 from typing import Set
@@ -6,7 +6,16 @@ from typing import Set
 from sila2.client import SilaClient
 from sila2.framework import FullyQualifiedFeatureIdentifier
 
-from .controlloopservice import ControlLoopServiceClient, ControlLoopServiceFeature, InvalidChannelIndex
+from .controlloopservice import (
+    ControlLoopServiceClient,
+    ControlLoopServiceFeature,
+    ControlLoopStopped,
+    InvalidChannelIndex,
+    InvalidLimits,
+    InvalidProfile,
+    ProfileAborted,
+    SettleTimeout,
+)
 
 
 class Client(SilaClient):
@@ -24,3 +33,23 @@ class Client(SilaClient):
         self._register_defined_execution_error_class(
             ControlLoopServiceFeature.defined_execution_errors["InvalidChannelIndex"], InvalidChannelIndex
         )
+
+        self._register_defined_execution_error_class(
+            ControlLoopServiceFeature.defined_execution_errors["InvalidProfile"], InvalidProfile
+        )
+
+        self._register_defined_execution_error_class(
+            ControlLoopServiceFeature.defined_execution_errors["ProfileAborted"], ProfileAborted
+        )
+
+        self._register_defined_execution_error_class(
+            ControlLoopServiceFeature.defined_execution_errors["ControlLoopStopped"], ControlLoopStopped
+        )
+
+        self._register_defined_execution_error_class(
+            ControlLoopServiceFeature.defined_execution_errors["SettleTimeout"], SettleTimeout
+        )
+
+        self._register_defined_execution_error_class(
+            ControlLoopServiceFeature.defined_execution_errors["InvalidLimits"], InvalidLimits
+        )
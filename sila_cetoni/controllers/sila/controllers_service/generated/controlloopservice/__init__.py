@@ -1,16 +1,64 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 from .controlloopservice_base import ControlLoopServiceBase
 from .controlloopservice_client import ControlLoopServiceClient
-from .controlloopservice_errors import InvalidChannelIndex
+from .controlloopservice_errors import (
+    ControlLoopStopped,
+    InvalidChannelIndex,
+    InvalidLimits,
+    InvalidProfile,
+    ProfileAborted,
+    SettleTimeout,
+)
 from .controlloopservice_feature import ControlLoopServiceFeature
-from .controlloopservice_types import RunControlLoop_Responses, StopControlLoop_Responses, WriteSetPoint_Responses
+from .controlloopservice_types import (
+    ChannelHistory,
+    ChannelLimitViolation,
+    ChannelLimitViolationEvent,
+    ChannelSetPoint,
+    ChannelValue,
+    GetDownsampledHistory_Responses,
+    GetHistory_Responses,
+    ProfilePoint,
+    RunControlLoop_Responses,
+    RunControlLoopUntilSettled_IntermediateResponses,
+    RunControlLoopUntilSettled_Responses,
+    RunSetPointProfile_IntermediateResponses,
+    RunSetPointProfile_Responses,
+    SetChannelLimits_Responses,
+    StopControlLoop_Responses,
+    StreamSamples_IntermediateResponses,
+    StreamSamples_Responses,
+    WriteSetPoint_Responses,
+    WriteSetPoints_Responses,
+)
 
 __all__ = [
     "ControlLoopServiceBase",
     "ControlLoopServiceFeature",
     "ControlLoopServiceClient",
     "WriteSetPoint_Responses",
+    "WriteSetPoints_Responses",
     "StopControlLoop_Responses",
+    "GetHistory_Responses",
+    "GetDownsampledHistory_Responses",
+    "SetChannelLimits_Responses",
     "RunControlLoop_Responses",
+    "RunControlLoopUntilSettled_Responses",
+    "RunControlLoopUntilSettled_IntermediateResponses",
+    "RunSetPointProfile_Responses",
+    "RunSetPointProfile_IntermediateResponses",
+    "StreamSamples_Responses",
+    "StreamSamples_IntermediateResponses",
     "InvalidChannelIndex",
+    "InvalidProfile",
+    "ProfileAborted",
+    "ControlLoopStopped",
+    "SettleTimeout",
+    "InvalidLimits",
+    "ChannelValue",
+    "ChannelSetPoint",
+    "ProfilePoint",
+    "ChannelHistory",
+    "ChannelLimitViolation",
+    "ChannelLimitViolationEvent",
 ]
@@ -1,4 +1,4 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
@@ -6,21 +6,52 @@ from queue import Queue
 from typing import TYPE_CHECKING, List, Optional, Union
 
 from sila2.framework import Command, Feature, FullyQualifiedIdentifier, Property
-from sila2.server import FeatureImplementationBase, MetadataDict, ObservableCommandInstance
-
-from .controlloopservice_types import RunControlLoop_Responses, StopControlLoop_Responses, WriteSetPoint_Responses
+from sila2.server import (
+    FeatureImplementationBase,
+    MetadataDict,
+    ObservableCommandInstance,
+    ObservableCommandInstanceWithIntermediateResponses,
+)
+
+from .controlloopservice_types import (
+    GetDownsampledHistory_Responses,
+    GetHistory_Responses,
+    RunControlLoop_Responses,
+    RunControlLoopUntilSettled_IntermediateResponses,
+    RunControlLoopUntilSettled_Responses,
+    RunSetPointProfile_IntermediateResponses,
+    RunSetPointProfile_Responses,
+    SetChannelLimits_Responses,
+    StopControlLoop_Responses,
+    StreamSamples_IntermediateResponses,
+    StreamSamples_Responses,
+    WriteSetPoint_Responses,
+    WriteSetPoints_Responses,
+)
 
 if TYPE_CHECKING:
-    from sila2.server import SilaServer
+    from ...server import Server
 
 
 class ControlLoopServiceBase(FeatureImplementationBase, ABC):
+    parent_server: Server
+
+    _ControllerValue_producer_queue: Queue[Union[float, Exception]]
+    _ControllerValue_current_value: float
+
+    _SetPointValue_producer_queue: Queue[Union[float, Exception]]
+    _SetPointValue_current_value: float
+
+    _ChannelValues_producer_queue: Queue[Union[List[ChannelValue], Exception]]
+    _ChannelValues_current_value: List[ChannelValue]
 
-    _ControllerValue_producer_queue: Queue[float]
+    _LimitViolations_producer_queue: Queue[Union[List[ChannelLimitViolation], Exception]]
+    _LimitViolations_current_value: List[ChannelLimitViolation]
 
-    _SetPointValue_producer_queue: Queue[float]
+    _LimitViolationEvents_producer_queue: Queue[Union[List[ChannelLimitViolationEvent], Exception]]
+    _LimitViolationEvents_current_value: List[ChannelLimitViolationEvent]
 
-    def __init__(self, parent_server: SilaServer):
+    def __init__(self, parent_server: Server):
         """
         Allows to control a Qmix Device with a Control Loop
         """
@@ -30,6 +61,12 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
 
         self._SetPointValue_producer_queue = Queue()
 
+        self._ChannelValues_producer_queue = Queue()
+
+        self._LimitViolations_producer_queue = Queue()
+
+        self._LimitViolationEvents_producer_queue = Queue()
+
     @abstractmethod
     def get_NumberOfChannels(self, *, metadata: MetadataDict) -> int:
         """
@@ -40,14 +77,27 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
         """
         pass
 
-    def update_ControllerValue(self, ControllerValue: float, queue: Optional[Queue[float]] = None):
+    @abstractmethod
+    def get_ChannelNames(self, *, metadata: MetadataDict) -> List[str]:
+        """
+        The names of all channels in the order of their channel indices. If the server hosts the channels of several devices, each name is qualified with the name of the device of the channel, i.e. 'Device/Channel'.
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :return: The names of all channels in the order of their channel indices. If the server hosts the channels of several devices, each name is qualified with the name of the device of the channel, i.e. 'Device/Channel'.
+        """
+        pass
+
+    def update_ControllerValue(self, ControllerValue: float, queue: Optional[Queue[float]] = None) -> None:
         """
         The actual value from the Device
 
         This method updates the observable property 'ControllerValue'.
+
+        :param queue: The queue to send updates to. If None, the default Queue will be used.
         """
         if queue is None:
             queue = self._ControllerValue_producer_queue
+            self._ControllerValue_current_value = ControllerValue
         queue.put(ControllerValue)
 
     def ControllerValue_on_subscription(self, *, metadata: MetadataDict) -> Optional[Queue[float]]:
@@ -62,14 +112,38 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
         """
         pass
 
-    def update_SetPointValue(self, SetPointValue: float, queue: Optional[Queue[float]] = None):
+    def abort_ControllerValue_subscriptions(self, error: Exception, queue: Optional[Queue[float]] = None) -> None:
+        """
+        The actual value from the Device
+
+        This method aborts subscriptions to the observable property 'ControllerValue'.
+
+        :param error: The Exception to be sent to the subscribing client.
+            If it is no DefinedExecutionError or UndefinedExecutionError, it will be wrapped in an UndefinedExecutionError.
+        :param queue: The queue to abort. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._ControllerValue_producer_queue
+        queue.put(error)
+
+    @property
+    def current_ControllerValue(self) -> float:
+        try:
+            return self._ControllerValue_current_value
+        except AttributeError:
+            raise AttributeError("Observable property ControllerValue has never been set")
+
+    def update_SetPointValue(self, SetPointValue: float, queue: Optional[Queue[float]] = None) -> None:
         """
         The current SetPoint value of the Device
 
         This method updates the observable property 'SetPointValue'.
+
+        :param queue: The queue to send updates to. If None, the default Queue will be used.
         """
         if queue is None:
             queue = self._SetPointValue_producer_queue
+            self._SetPointValue_current_value = SetPointValue
         queue.put(SetPointValue)
 
     def SetPointValue_on_subscription(self, *, metadata: MetadataDict) -> Optional[Queue[float]]:
@@ -84,6 +158,183 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
         """
         pass
 
+    def abort_SetPointValue_subscriptions(self, error: Exception, queue: Optional[Queue[float]] = None) -> None:
+        """
+        The current SetPoint value of the Device
+
+        This method aborts subscriptions to the observable property 'SetPointValue'.
+
+        :param error: The Exception to be sent to the subscribing client.
+            If it is no DefinedExecutionError or UndefinedExecutionError, it will be wrapped in an UndefinedExecutionError.
+        :param queue: The queue to abort. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._SetPointValue_producer_queue
+        queue.put(error)
+
+    @property
+    def current_SetPointValue(self) -> float:
+        try:
+            return self._SetPointValue_current_value
+        except AttributeError:
+            raise AttributeError("Observable property SetPointValue has never been set")
+
+    def update_ChannelValues(
+        self, ChannelValues: List[ChannelValue], queue: Optional[Queue[List[ChannelValue]]] = None
+    ) -> None:
+        """
+        The actual values and the set points of all channels in the order of their channel indices. A new value is only sent if at least one of the values has changed since the last poll of the channels.
+
+        This method updates the observable property 'ChannelValues'.
+
+        :param queue: The queue to send updates to. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._ChannelValues_producer_queue
+            self._ChannelValues_current_value = ChannelValues
+        queue.put(ChannelValues)
+
+    def ChannelValues_on_subscription(self, *, metadata: MetadataDict) -> Optional[Queue[List[ChannelValue]]]:
+        """
+        The actual values and the set points of all channels in the order of their channel indices. A new value is only sent if at least one of the values has changed since the last poll of the channels.
+
+        This method is called when a client subscribes to the observable property 'ChannelValues'
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :return: Optional `Queue` that should be used for updating this property.
+            If None, the default Queue will be used.
+        """
+        pass
+
+    def abort_ChannelValues_subscriptions(
+        self, error: Exception, queue: Optional[Queue[List[ChannelValue]]] = None
+    ) -> None:
+        """
+        The actual values and the set points of all channels in the order of their channel indices. A new value is only sent if at least one of the values has changed since the last poll of the channels.
+
+        This method aborts subscriptions to the observable property 'ChannelValues'.
+
+        :param error: The Exception to be sent to the subscribing client.
+            If it is no DefinedExecutionError or UndefinedExecutionError, it will be wrapped in an UndefinedExecutionError.
+        :param queue: The queue to abort. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._ChannelValues_producer_queue
+        queue.put(error)
+
+    @property
+    def current_ChannelValues(self) -> List[ChannelValue]:
+        try:
+            return self._ChannelValues_current_value
+        except AttributeError:
+            raise AttributeError("Observable property ChannelValues has never been set")
+
+    def update_LimitViolations(
+        self, LimitViolations: List[ChannelLimitViolation], queue: Optional[Queue[List[ChannelLimitViolation]]] = None
+    ) -> None:
+        """
+        The state of the limit monitoring: the limit violations of all channels that are currently active (see Set Channel Limits). A new value is only sent when a violation starts or ends. A violation that starts and ends before a client reads this property is not contained in any value it receives, use Limit Violation Events to get every violation.
+
+        This method updates the observable property 'LimitViolations'.
+
+        :param queue: The queue to send updates to. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._LimitViolations_producer_queue
+            self._LimitViolations_current_value = LimitViolations
+        queue.put(LimitViolations)
+
+    def LimitViolations_on_subscription(
+        self, *, metadata: MetadataDict
+    ) -> Optional[Queue[List[ChannelLimitViolation]]]:
+        """
+        The state of the limit monitoring: the limit violations of all channels that are currently active (see Set Channel Limits). A new value is only sent when a violation starts or ends. A violation that starts and ends before a client reads this property is not contained in any value it receives, use Limit Violation Events to get every violation.
+
+        This method is called when a client subscribes to the observable property 'LimitViolations'
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :return: Optional `Queue` that should be used for updating this property.
+            If None, the default Queue will be used.
+        """
+        pass
+
+    def abort_LimitViolations_subscriptions(
+        self, error: Exception, queue: Optional[Queue[List[ChannelLimitViolation]]] = None
+    ) -> None:
+        """
+        The state of the limit monitoring: the limit violations of all channels that are currently active (see Set Channel Limits). A new value is only sent when a violation starts or ends. A violation that starts and ends before a client reads this property is not contained in any value it receives, use Limit Violation Events to get every violation.
+
+        This method aborts subscriptions to the observable property 'LimitViolations'.
+
+        :param error: The Exception to be sent to the subscribing client.
+            If it is no DefinedExecutionError or UndefinedExecutionError, it will be wrapped in an UndefinedExecutionError.
+        :param queue: The queue to abort. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._LimitViolations_producer_queue
+        queue.put(error)
+
+    @property
+    def current_LimitViolations(self) -> List[ChannelLimitViolation]:
+        try:
+            return self._LimitViolations_current_value
+        except AttributeError:
+            raise AttributeError("Observable property LimitViolations has never been set")
+
+    def update_LimitViolationEvents(
+        self,
+        LimitViolationEvents: List[ChannelLimitViolationEvent],
+        queue: Optional[Queue[List[ChannelLimitViolationEvent]]] = None,
+    ) -> None:
+        """
+        The starts and ends of the limit violations of all channels (see Set Channel Limits). Every value contains the events of one poll of the channels (or of setting the limits of a channel) and is only sent once, so a subscriber gets every violation, even one that ends right after it has started. A new subscriber only gets the events that occur after it has subscribed, the violations that are active at that time are available from the Limit Violations property.
+
+        This method updates the observable property 'LimitViolationEvents'.
+
+        :param queue: The queue to send updates to. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._LimitViolationEvents_producer_queue
+            self._LimitViolationEvents_current_value = LimitViolationEvents
+        queue.put(LimitViolationEvents)
+
+    def LimitViolationEvents_on_subscription(
+        self, *, metadata: MetadataDict
+    ) -> Optional[Queue[List[ChannelLimitViolationEvent]]]:
+        """
+        The starts and ends of the limit violations of all channels (see Set Channel Limits). Every value contains the events of one poll of the channels (or of setting the limits of a channel) and is only sent once, so a subscriber gets every violation, even one that ends right after it has started. A new subscriber only gets the events that occur after it has subscribed, the violations that are active at that time are available from the Limit Violations property.
+
+        This method is called when a client subscribes to the observable property 'LimitViolationEvents'
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :return: Optional `Queue` that should be used for updating this property.
+            If None, the default Queue will be used.
+        """
+        pass
+
+    def abort_LimitViolationEvents_subscriptions(
+        self, error: Exception, queue: Optional[Queue[List[ChannelLimitViolationEvent]]] = None
+    ) -> None:
+        """
+        The starts and ends of the limit violations of all channels (see Set Channel Limits). Every value contains the events of one poll of the channels (or of setting the limits of a channel) and is only sent once, so a subscriber gets every violation, even one that ends right after it has started. A new subscriber only gets the events that occur after it has subscribed, the violations that are active at that time are available from the Limit Violations property.
+
+        This method aborts subscriptions to the observable property 'LimitViolationEvents'.
+
+        :param error: The Exception to be sent to the subscribing client.
+            If it is no DefinedExecutionError or UndefinedExecutionError, it will be wrapped in an UndefinedExecutionError.
+        :param queue: The queue to abort. If None, the default Queue will be used.
+        """
+        if queue is None:
+            queue = self._LimitViolationEvents_producer_queue
+        queue.put(error)
+
+    @property
+    def current_LimitViolationEvents(self) -> List[ChannelLimitViolationEvent]:
+        try:
+            return self._LimitViolationEvents_current_value
+        except AttributeError:
+            raise AttributeError("Observable property LimitViolationEvents has never been set")
+
     @abstractmethod
     def WriteSetPoint(self, SetPointValue: float, *, metadata: MetadataDict) -> WriteSetPoint_Responses:
         """
@@ -97,12 +348,119 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
         """
         pass
 
+    @abstractmethod
+    def WriteSetPoints(self, SetPoints: List[ChannelSetPoint], *, metadata: MetadataDict) -> WriteSetPoints_Responses:
+        """
+        Write Set Point values to several channels of the Controller Device at once. All channel indices are checked before the first value is written, so no value is written if any of the indices is invalid.
+
+
+        :param SetPoints: The channels and the Set Point values to write to them
+
+        :param metadata: The SiLA Client Metadata attached to the call
+
+        :return:
+
+            - WriteDurations: The time it took to write each of the Set Point values to the device (in the same order as the Set Points)
+
+
+        """
+        pass
+
     @abstractmethod
     def StopControlLoop(self, *, metadata: MetadataDict) -> StopControlLoop_Responses:
         """
         Stops the Control Loop (has no effect, if no Loop is currently running)
 
 
+        :param metadata: The SiLA Client Metadata attached to the call
+
+        """
+        pass
+
+    @abstractmethod
+    def GetHistory(
+        self, ChannelIndices: List[int], StartTime: float, EndTime: float, *, metadata: MetadataDict
+    ) -> GetHistory_Responses:
+        """
+        Get the Controller Values and Set Points of one or more channels that have been recorded by the server in the given time range. The server only keeps a limited number of samples per channel.
+
+
+        :param ChannelIndices: The indices of the channels to get the history for
+
+        :param StartTime: The start of the time range as seconds since the Unix epoch (1970-01-01 00:00:00 UTC)
+
+        :param EndTime: The end of the time range as seconds since the Unix epoch (1970-01-01 00:00:00 UTC)
+
+        :param metadata: The SiLA Client Metadata attached to the call
+
+        :return:
+
+            - History: The history of each of the requested channels (in the same order as the Channel Indices)
+
+
+        """
+        pass
+
+    @abstractmethod
+    def GetDownsampledHistory(
+        self,
+        ChannelIndices: List[int],
+        StartTime: float,
+        EndTime: float,
+        Mode: str,
+        PointCount: int,
+        *,
+        metadata: MetadataDict,
+    ) -> GetDownsampledHistory_Responses:
+        """
+        Like Get History but the server reduces the samples of each channel to the given number of points before sending them. This is meant for displaying long time ranges.
+
+
+        :param ChannelIndices: The indices of the channels to get the history for
+
+        :param StartTime: The start of the time range as seconds since the Unix epoch (1970-01-01 00:00:00 UTC)
+
+        :param EndTime: The end of the time range as seconds since the Unix epoch (1970-01-01 00:00:00 UTC)
+
+        :param Mode: How to reduce the samples: 'MinMax' splits the time range into Point Count / 2 buckets of equal duration and keeps the samples with the smallest and the largest Controller Value of each bucket, 'Mean' splits the time range into Point Count buckets of equal duration and averages the samples of each bucket, 'LTTB' selects Point Count samples with the Largest-Triangle-Three-Buckets algorithm based on the Controller Values.
+
+        :param PointCount: The maximum number of samples to return per channel
+
+        :param metadata: The SiLA Client Metadata attached to the call
+
+        :return:
+
+            - History: The downsampled history of each of the requested channels (in the same order as the Channel Indices)
+
+
+        """
+        pass
+
+    @abstractmethod
+    def SetChannelLimits(
+        self,
+        HighLimit: float,
+        LowLimit: float,
+        MaxDeviation: float,
+        DeviationHoldTime: float,
+        MaxRateOfChange: float,
+        *,
+        metadata: MetadataDict,
+    ) -> SetChannelLimits_Responses:
+        """
+        Set the limits that the server monitors for a channel while polling it. Every start and end of a violation of a limit is reported by the Limit Violation Events property and the active violations by the Limit Violations property, so a client does not need to watch the Controller Value itself. The new limits replace all previous limits of the channel and end its active violations.
+
+
+        :param HighLimit: The Controller Value above which a violation is reported (NaN to disable this limit)
+
+        :param LowLimit: The Controller Value below which a violation is reported (NaN to disable this limit)
+
+        :param MaxDeviation: The maximum absolute deviation of the Controller Value from the Set Point (0 to disable this limit)
+
+        :param DeviationHoldTime: The time the deviation has to exceed the Max Deviation before a violation is reported (e.g. to ignore the deviation right after a new Set Point has been written)
+
+        :param MaxRateOfChange: The maximum absolute rate of change of the Controller Value between two polls (0 to disable this limit)
+
         :param metadata: The SiLA Client Metadata attached to the call
 
         """
@@ -122,6 +480,89 @@ class ControlLoopServiceBase(FeatureImplementationBase, ABC):
         """
         pass
 
+    @abstractmethod
+    def RunControlLoopUntilSettled(
+        self,
+        SettleTolerance: float,
+        SettleTime: float,
+        Timeout: float,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[RunControlLoopUntilSettled_IntermediateResponses],
+    ) -> RunControlLoopUntilSettled_Responses:
+        """
+        Run the Control Loop and only finish when the Controller Value has stayed within the Settle Tolerance around the Set Point for the Settle Time or when the Timeout has elapsed.
+
+
+        :param SettleTolerance: The maximum deviation of the Controller Value from the Set Point for the Control Loop to be regarded as settled
+
+        :param SettleTime: The time the Controller Value has to stay within the Settle Tolerance for the Control Loop to be regarded as settled
+
+        :param Timeout: The longest time to wait for the Control Loop to settle. The Control Loop keeps running if it has not settled within this time.
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :param instance: The command instance, enabling sending status updates to subscribed clients
+
+        """
+        pass
+
+    @abstractmethod
+    def RunSetPointProfile(
+        self,
+        Profile: List[ProfilePoint],
+        Interpolation: str,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[RunSetPointProfile_IntermediateResponses],
+    ) -> RunSetPointProfile_Responses:
+        """
+        Runs a Set Point profile, i.e. the server writes the Set Point values of the given profile points to the device at the respective times. The command finishes when the time of the last point is reached. A running profile is aborted by the Stop Control Loop command or if another profile is started for the same channel.
+
+
+        :param Profile: The points of the profile. The times of the points must not decrease.
+
+        :param Interpolation: How the Set Point changes between two points of the profile: 'Linear' ramps the Set Point linearly from one point to the next, 'Step' holds the Set Point of a point until the time of the next point.
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :param instance: The command instance, enabling sending status updates to subscribed clients
+
+        """
+        pass
+
+    @abstractmethod
+    def StreamSamples(
+        self,
+        ChannelIndices: List[int],
+        BlockSize: int,
+        MaxLatency: float,
+        Duration: float,
+        *,
+        metadata: MetadataDict,
+        instance: ObservableCommandInstanceWithIntermediateResponses[StreamSamples_IntermediateResponses],
+    ) -> StreamSamples_Responses:
+        """
+        Streams every sample that the server polls from the given channels in blocks of packed samples instead of one message per changed value. A block is sent as soon as a channel has collected Block Size samples or the oldest collected sample has waited for Max Latency. Each intermediate response contains the blocks of all channels that have collected samples since the last response. The command finishes after the given duration.
+
+
+        :param ChannelIndices: The indices of the channels to stream the samples of
+
+        :param BlockSize: The number of samples per channel that are sent in one block
+
+        :param MaxLatency: The longest time a sample is held back to fill a block
+
+        :param Duration: How long to stream the samples, 0 streams them until the server is stopped
+
+        :param metadata: The SiLA Client Metadata attached to the call
+        :param instance: The command instance, enabling sending status updates to subscribed clients
+
+        :return:
+
+            - SampleCount: The number of samples that have been sent for all channels together
+
+
+        """
+        pass
+
     @abstractmethod
     def get_calls_affected_by_ChannelIndex(self) -> List[Union[Feature, Command, Property, FullyQualifiedIdentifier]]:
         """
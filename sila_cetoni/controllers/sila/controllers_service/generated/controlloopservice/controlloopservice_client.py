@@ -1,4 +1,4 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 # -----
 # This class does not do anything useful at runtime. Its only purpose is to provide type annotations.
 # Since sphinx does not support .pyi files (yet?), so this is a .py file.
@@ -10,13 +10,28 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
 
-    from typing import Iterable, Optional
+    from typing import Iterable, List, Optional
 
-    from controlloopservice_types import RunControlLoop_Responses, StopControlLoop_Responses, WriteSetPoint_Responses
+    from controlloopservice_types import (
+        GetDownsampledHistory_Responses,
+        GetHistory_Responses,
+        RunControlLoop_Responses,
+        RunControlLoopUntilSettled_IntermediateResponses,
+        RunControlLoopUntilSettled_Responses,
+        RunSetPointProfile_IntermediateResponses,
+        RunSetPointProfile_Responses,
+        SetChannelLimits_Responses,
+        StopControlLoop_Responses,
+        StreamSamples_IntermediateResponses,
+        StreamSamples_Responses,
+        WriteSetPoint_Responses,
+        WriteSetPoints_Responses,
+    )
     from sila2.client import (
         ClientMetadata,
         ClientMetadataInstance,
         ClientObservableCommandInstance,
+        ClientObservableCommandInstanceWithIntermediateResponses,
         ClientObservableProperty,
         ClientUnobservableProperty,
     )
@@ -32,6 +47,11 @@ class ControlLoopServiceClient:
     The number of controller channels.
     """
 
+    ChannelNames: ClientUnobservableProperty[List[str]]
+    """
+    The names of all channels in the order of their channel indices. If the server hosts the channels of several devices, each name is qualified with the name of the device of the channel, i.e. 'Device/Channel'.
+    """
+
     ControllerValue: ClientObservableProperty[float]
     """
     The actual value from the Device
@@ -42,6 +62,21 @@ class ControlLoopServiceClient:
     The current SetPoint value of the Device
     """
 
+    ChannelValues: ClientObservableProperty[List[ChannelValue]]
+    """
+    The actual values and the set points of all channels in the order of their channel indices. A new value is only sent if at least one of the values has changed since the last poll of the channels.
+    """
+
+    LimitViolations: ClientObservableProperty[List[ChannelLimitViolation]]
+    """
+    The state of the limit monitoring: the limit violations of all channels that are currently active (see Set Channel Limits). A new value is only sent when a violation starts or ends. A violation that starts and ends before a client reads this property is not contained in any value it receives, use Limit Violation Events to get every violation.
+    """
+
+    LimitViolationEvents: ClientObservableProperty[List[ChannelLimitViolationEvent]]
+    """
+    The starts and ends of the limit violations of all channels (see Set Channel Limits). Every value contains the events of one poll of the channels (or of setting the limits of a channel) and is only sent once, so a subscriber gets every violation, even one that ends right after it has started. A new subscriber only gets the events that occur after it has subscribed, the violations that are active at that time are available from the Limit Violations property.
+    """
+
     ChannelIndex: ClientMetadata[int]
     """
     The index of the channel that should be used. This value is 0-indexed, i.e. the first channel has index 0, the second one index 1 and so on.
@@ -55,6 +90,14 @@ class ControlLoopServiceClient:
         """
         ...
 
+    def WriteSetPoints(
+        self, SetPoints: List[ChannelSetPoint], *, metadata: Optional[Iterable[ClientMetadataInstance]] = None
+    ) -> WriteSetPoints_Responses:
+        """
+        Write Set Point values to several channels of the Controller Device at once. All channel indices are checked before the first value is written, so no value is written if any of the indices is invalid.
+        """
+        ...
+
     def StopControlLoop(
         self, *, metadata: Optional[Iterable[ClientMetadataInstance]] = None
     ) -> StopControlLoop_Responses:
@@ -63,6 +106,49 @@ class ControlLoopServiceClient:
         """
         ...
 
+    def GetHistory(
+        self,
+        ChannelIndices: List[int],
+        StartTime: float,
+        EndTime: float,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> GetHistory_Responses:
+        """
+        Get the Controller Values and Set Points of one or more channels that have been recorded by the server in the given time range. The server only keeps a limited number of samples per channel.
+        """
+        ...
+
+    def GetDownsampledHistory(
+        self,
+        ChannelIndices: List[int],
+        StartTime: float,
+        EndTime: float,
+        Mode: str,
+        PointCount: int,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> GetDownsampledHistory_Responses:
+        """
+        Like Get History but the server reduces the samples of each channel to the given number of points before sending them. This is meant for displaying long time ranges.
+        """
+        ...
+
+    def SetChannelLimits(
+        self,
+        HighLimit: float,
+        LowLimit: float,
+        MaxDeviation: float,
+        DeviationHoldTime: float,
+        MaxRateOfChange: float,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> SetChannelLimits_Responses:
+        """
+        Set the limits that the server monitors for a channel while polling it. Every start and end of a violation of a limit is reported by the Limit Violation Events property and the active violations by the Limit Violations property, so a client does not need to watch the Controller Value itself. The new limits replace all previous limits of the channel and end its active violations.
+        """
+        ...
+
     def RunControlLoop(
         self, *, metadata: Optional[Iterable[ClientMetadataInstance]] = None
     ) -> ClientObservableCommandInstance[RunControlLoop_Responses]:
@@ -70,3 +156,48 @@ class ControlLoopServiceClient:
         Run the Control Loop
         """
         ...
+
+    def RunControlLoopUntilSettled(
+        self,
+        SettleTolerance: float,
+        SettleTime: float,
+        Timeout: float,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> ClientObservableCommandInstanceWithIntermediateResponses[
+        RunControlLoopUntilSettled_IntermediateResponses, RunControlLoopUntilSettled_Responses
+    ]:
+        """
+        Run the Control Loop and only finish when the Controller Value has stayed within the Settle Tolerance around the Set Point for the Settle Time or when the Timeout has elapsed.
+        """
+        ...
+
+    def RunSetPointProfile(
+        self,
+        Profile: List[ProfilePoint],
+        Interpolation: str,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> ClientObservableCommandInstanceWithIntermediateResponses[
+        RunSetPointProfile_IntermediateResponses, RunSetPointProfile_Responses
+    ]:
+        """
+        Runs a Set Point profile, i.e. the server writes the Set Point values of the given profile points to the device at the respective times. The command finishes when the time of the last point is reached. A running profile is aborted by the Stop Control Loop command or if another profile is started for the same channel.
+        """
+        ...
+
+    def StreamSamples(
+        self,
+        ChannelIndices: List[int],
+        BlockSize: int,
+        MaxLatency: float,
+        Duration: float,
+        *,
+        metadata: Optional[Iterable[ClientMetadataInstance]] = None,
+    ) -> ClientObservableCommandInstanceWithIntermediateResponses[
+        StreamSamples_IntermediateResponses, StreamSamples_Responses
+    ]:
+        """
+        Streams every sample that the server polls from the given channels in blocks of packed samples instead of one message per changed value. A block is sent as soon as a channel has collected Block Size samples or the oldest collected sample has waited for Max Latency. Each intermediate response contains the blocks of all channels that have collected samples since the last response. The command finishes after the given duration.
+        """
+        ...
@@ -1,4 +1,4 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 from __future__ import annotations
 
 from typing import Optional
@@ -13,3 +13,40 @@ class InvalidChannelIndex(DefinedExecutionError):
         if message is None:
             message = "The sent channel index is not known."
         super().__init__(ControlLoopServiceFeature.defined_execution_errors["InvalidChannelIndex"], message=message)
+
+
+class InvalidProfile(DefinedExecutionError):
+    def __init__(self, message: Optional[str] = None):
+        if message is None:
+            message = "The profile is empty, contains a negative or non-finite time, times that decrease or a non-finite set point."
+        super().__init__(ControlLoopServiceFeature.defined_execution_errors["InvalidProfile"], message=message)
+
+
+class ProfileAborted(DefinedExecutionError):
+    def __init__(self, message: Optional[str] = None):
+        if message is None:
+            message = "The profile has been aborted before it was finished because the Control Loop has been stopped, another profile has been started for the same channel or the server has been stopped."
+        super().__init__(ControlLoopServiceFeature.defined_execution_errors["ProfileAborted"], message=message)
+
+
+class ControlLoopStopped(DefinedExecutionError):
+    def __init__(self, message: Optional[str] = None):
+        if message is None:
+            message = (
+                "The Control Loop has been stopped or the server has been stopped before the Control Loop has settled."
+            )
+        super().__init__(ControlLoopServiceFeature.defined_execution_errors["ControlLoopStopped"], message=message)
+
+
+class SettleTimeout(DefinedExecutionError):
+    def __init__(self, message: Optional[str] = None):
+        if message is None:
+            message = "The Control Loop has not settled within the Timeout. The Control Loop keeps running."
+        super().__init__(ControlLoopServiceFeature.defined_execution_errors["SettleTimeout"], message=message)
+
+
+class InvalidLimits(DefinedExecutionError):
+    def __init__(self, message: Optional[str] = None):
+        if message is None:
+            message = "The Low Limit is greater than the High Limit."
+        super().__init__(ControlLoopServiceFeature.defined_execution_errors["InvalidLimits"], message=message)
@@ -1,7 +1,7 @@
-# Generated by sila2.code_generator; sila2.__version__: 0.8.0
+# Generated by sila2.code_generator; sila2.__version__: 0.10.1
 from __future__ import annotations
 
-from typing import NamedTuple
+from typing import Any, List, NamedTuple
 
 
 class WriteSetPoint_Responses(NamedTuple):
@@ -9,11 +9,95 @@ class WriteSetPoint_Responses(NamedTuple):
     pass
 
 
+class WriteSetPoints_Responses(NamedTuple):
+
+    WriteDurations: List[float]
+    """
+    The time it took to write each of the Set Point values to the device (in the same order as the Set Points)
+    """
+
+
 class StopControlLoop_Responses(NamedTuple):
 
     pass
 
 
+class GetHistory_Responses(NamedTuple):
+
+    History: List[ChannelHistory]
+    """
+    The history of each of the requested channels (in the same order as the Channel Indices)
+    """
+
+
+class GetDownsampledHistory_Responses(NamedTuple):
+
+    History: List[ChannelHistory]
+    """
+    The downsampled history of each of the requested channels (in the same order as the Channel Indices)
+    """
+
+
+class SetChannelLimits_Responses(NamedTuple):
+
+    pass
+
+
 class RunControlLoop_Responses(NamedTuple):
 
     pass
+
+
+class RunControlLoopUntilSettled_Responses(NamedTuple):
+
+    pass
+
+
+class RunSetPointProfile_Responses(NamedTuple):
+
+    pass
+
+
+class StreamSamples_Responses(NamedTuple):
+
+    SampleCount: int
+    """
+    The number of samples that have been sent for all channels together
+    """
+
+
+class RunControlLoopUntilSettled_IntermediateResponses(NamedTuple):
+
+    ControlDeviation: float
+    """
+    The current deviation of the Controller Value from the Set Point (i.e. Controller Value - Set Point)
+    """
+
+
+class RunSetPointProfile_IntermediateResponses(NamedTuple):
+
+    CurrentSetPoint: float
+    """
+    The Set Point value that has been written to the device last
+    """
+
+
+class StreamSamples_IntermediateResponses(NamedTuple):
+
+    SampleBlocks: List[ChannelHistory]
+    """
+    The new samples of each channel that has collected samples since the last response (packed like the History of the Get History command)
+    """
+
+
+ChannelValue = Any
+
+ChannelSetPoint = Any
+
+ProfilePoint = Any
+
+ChannelHistory = Any
+
+ChannelLimitViolation = Any
+
+ChannelLimitViolationEvent = Any
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 from uuid import UUID
 
-from qmixsdk.qmixcontroller import ControllerChannel
 from sila2.server import SilaServer
 
-from .feature_implementations.controlloopservice_impl import ControlLoopServiceImpl
-from .generated.controlloopservice import ControlLoopServiceFeature
+if TYPE_CHECKING:
+    from qmixsdk.qmixcontroller import ControllerChannel
+
+    from .feature_implementations.controlloopservice_impl import ControlLoopServiceImpl
+    from .feature_implementations.emission_filter import EmissionPolicy
+    from .feature_implementations.metrics import ServiceMetrics
+    from .feature_implementations.trace_recorder import TraceRecorder
 
 
 class Server(SilaServer):
@@ -20,9 +24,25 @@ class Server(SilaServer):
         server_version: str = "",
         server_vendor_url: str = "",
         server_uuid: Optional[Union[str, UUID]] = None,
+        poll_interval: float = 0.1,
+        subscription_buffer_size: int = 10,
+        history_capacity: int = 36000,
+        trace_recorder: Optional[TraceRecorder] = None,
+        idle_poll_interval: Optional[float] = None,
+        metrics: Optional[ServiceMetrics] = None,
+        min_set_point_interval: float = 0,
+        set_point_reconcile_interval: Optional[float] = None,
+        channel_names: Optional[List[str]] = None,
+        emission_policies: Optional[Dict[str, Union[EmissionPolicy, List[EmissionPolicy]]]] = None,
+        max_grpc_workers: int = 100,
     ):
         from ... import __version__
 
+        # the feature implementation and definition (which is parsed on import) are only needed once a server is
+        # created, importing them here keeps importing this module cheap
+        from .feature_implementations.controlloopservice_impl import ControlLoopServiceImpl
+        from .generated.controlloopservice import ControlLoopServiceFeature
+
         super().__init__(
             server_name=server_name or "Control Loop Service",
             server_type=server_type or "TestServer",
@@ -30,8 +50,22 @@ class Server(SilaServer):
             server_version=server_version or __version__,
             server_vendor_url=server_vendor_url or "https://www.cetoni.com",
             server_uuid=server_uuid,
+            max_grpc_workers=max_grpc_workers,
         )
 
-        self.controlloopservice = ControlLoopServiceImpl(self, controller_channels)
+        self.controlloopservice = ControlLoopServiceImpl(
+            self,
+            controller_channels,
+            poll_interval,
+            subscription_buffer_size,
+            history_capacity,
+            trace_recorder,
+            idle_poll_interval,
+            metrics,
+            min_set_point_interval,
+            set_point_reconcile_interval,
+            channel_names,
+            emission_policies,
+        )
 
         self.set_feature_implementation(ControlLoopServiceFeature, self.controlloopservice)
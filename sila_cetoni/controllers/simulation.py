@@ -0,0 +1,315 @@
+"""
+Simulated controller channels for testing and load testing without qmix hardware
+
+A `SimulatedControllerBank` simulates any number of first-order-plus-dead-time (FOPDT) plants, each of which is
+controlled by a PID controller, as NumPy arrays that are advanced together in fixed time steps. The channels of the
+bank (`SimulatedControllerBank.channels`) have the same interface as `qmixcontroller.ControllerChannel` as far as it
+is used by this package, so they can be passed to the `Server` instead of real channels.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class SimulatedControllerChannel:
+    """
+    A single channel of a `SimulatedControllerBank`
+
+    Every call takes the `latency` of the bank (to mimic the round trip on the device bus) and then advances the
+    simulation up to the current time.
+    """
+
+    __bank: SimulatedControllerBank
+    __index: int
+
+    def __init__(self, bank: SimulatedControllerBank, index: int) -> None:
+        self.__bank = bank
+        self.__index = index
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    def get_name(self) -> str:
+        return self.__bank.names[self.__index]
+
+    def get_setpoint(self) -> float:
+        return self.__bank.get_set_point(self.__index)
+
+    def write_setpoint(self, set_point: float) -> None:
+        self.__bank.write_set_point(self.__index, set_point)
+
+    def read_actual_value(self) -> float:
+        return self.__bank.read_actual_value(self.__index)
+
+    def enable_control_loop(self, enable: bool) -> None:
+        self.__bank.enable_control_loop(self.__index, enable)
+
+    def is_control_loop_enabled(self) -> bool:
+        return self.__bank.is_control_loop_enabled(self.__index)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.__index}, {self.get_name()!r})"
+
+
+class SimulatedControllerBank:
+    """
+    A bank of `channel_count` simulated controller channels
+
+    Each channel simulates a plant with the actual value `y` and the controller output `u`
+
+        time_constant * dy/dt = ambient - y + gain * u(t - dead_time)
+
+    which is controlled by a PID controller (with derivative on the measurement, anti-windup by conditional
+    integration and the output limited to `output_limits`) while the control loop of the channel is enabled. If the
+    control loop is disabled, the output is 0 and the value approaches `ambient`.
+
+    All plant and controller parameters can be given as scalars (same for all channels) or as arrays with a value per
+    channel. If the PID gains are not given, they are derived from the plant parameters with the SIMC tuning rules.
+
+    The simulation is advanced in steps of `time_step` seconds whenever a channel is accessed, i.e. no background
+    thread is needed and the state of all channels is updated with a few vectorized operations per step.
+    """
+
+    names: List[str]
+    channels: List[SimulatedControllerChannel]
+    __channel_count: int
+    __time_step: float
+    __latency: float
+    __noise: float
+    __rng: np.random.Generator
+    __lock: Lock
+    __last_update: float
+
+    __ambient: np.ndarray
+    __alpha: np.ndarray  # 1 - exp(-time_step / time_constant)
+    __gain: np.ndarray
+    __delay_steps: np.ndarray
+    __kp: np.ndarray
+    __ki: np.ndarray
+    __kd: np.ndarray
+    __output_min: np.ndarray
+    __output_max: np.ndarray
+
+    __values: np.ndarray
+    __value_rate: np.ndarray  # change of the values in the last step per second
+    __set_points: np.ndarray
+    __loop_enabled: np.ndarray
+    __integrals: np.ndarray
+    __outputs: np.ndarray
+    __output_history: np.ndarray  # ring buffer with the last outputs of all channels for the dead time
+    __history_head: int
+    __channel_indices: np.ndarray
+
+    def __init__(
+        self,
+        channel_count: int,
+        *,
+        gain: ArrayLike = 1.0,
+        time_constant: ArrayLike = 20.0,
+        dead_time: ArrayLike = 1.0,
+        ambient: ArrayLike = 20.0,
+        kp: Optional[ArrayLike] = None,
+        ki: Optional[ArrayLike] = None,
+        kd: ArrayLike = 0.0,
+        output_limits: tuple = (-100.0, 100.0),
+        time_step: float = 0.05,
+        latency: float = 0.0,
+        noise: float = 0.0,
+        names: Optional[Sequence[str]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Constructor
+
+        Parameters
+        ----------
+        channel_count: int
+            The number of channels to simulate
+        gain, time_constant (s), dead_time (s), ambient: float | array (default: 1, 20, 1, 20)
+            The parameters of the plants
+        kp, ki (1/s), kd (s): float | array (optional)
+            The PID gains, `kp` and `ki` default to the SIMC tuning for the plant parameters
+        output_limits: tuple (default: (-100, 100))
+            The minimum and maximum controller output
+        time_step: float (default: 0.05)
+            The time step of the simulation in seconds
+        latency: float (default: 0)
+            The time every call of a channel takes in seconds
+        noise: float (default: 0)
+            The standard deviation of the measurement noise added to the actual values
+        names: Sequence[str] (optional)
+            The names of the channels
+        seed: int (optional)
+            The seed for the measurement noise
+        """
+        if channel_count < 0:
+            raise ValueError(f"The channel count must not be negative, got {channel_count}")
+        if time_step <= 0:
+            raise ValueError(f"The time step must be positive, got {time_step}")
+
+        def per_channel(value: ArrayLike) -> np.ndarray:
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (channel_count,)).copy()
+
+        self.__channel_count = channel_count
+        self.__time_step = time_step
+        self.__latency = latency
+        self.__noise = noise
+        self.__rng = np.random.default_rng(seed)
+        self.__lock = Lock()
+        self.names = (
+            list(names) if names is not None else [f"SimulatedReactor{i}_Temperature" for i in range(channel_count)]
+        )
+        if len(self.names) != channel_count:
+            raise ValueError(f"Got {len(self.names)} names for {channel_count} channels")
+
+        time_constant = per_channel(time_constant)
+        dead_time = per_channel(dead_time)
+        self.__ambient = per_channel(ambient)
+        self.__gain = per_channel(gain)
+        self.__alpha = -np.expm1(-time_step / time_constant)
+        self.__delay_steps = np.rint(dead_time / time_step).astype(np.intp)
+
+        # SIMC rules with the closed-loop time constant set to the dead time
+        closed_loop_time = np.maximum(dead_time, time_step)
+        self.__kp = (
+            per_channel(kp) if kp is not None else time_constant / (self.__gain * (closed_loop_time + dead_time))
+        )
+        self.__ki = (
+            per_channel(ki)
+            if ki is not None
+            else self.__kp / np.minimum(time_constant, 4 * (closed_loop_time + dead_time))
+        )
+        self.__kd = per_channel(kd)
+        self.__output_min = per_channel(output_limits[0])
+        self.__output_max = per_channel(output_limits[1])
+
+        self.__values = self.__ambient.copy()
+        self.__value_rate = np.zeros(channel_count)
+        self.__set_points = self.__ambient.copy()
+        self.__loop_enabled = np.zeros(channel_count, dtype=bool)
+        self.__integrals = np.zeros(channel_count)
+        self.__outputs = np.zeros(channel_count)
+        self.__output_history = np.zeros((int(self.__delay_steps.max(initial=0)) + 1, channel_count))
+        self.__history_head = 0
+        self.__channel_indices = np.arange(channel_count)
+        self.__last_update = time.monotonic()
+
+        self.channels = [SimulatedControllerChannel(self, i) for i in range(channel_count)]
+
+    @property
+    def channel_count(self) -> int:
+        return self.__channel_count
+
+    @property
+    def time_step(self) -> float:
+        return self.__time_step
+
+    @property
+    def latency(self) -> float:
+        return self.__latency
+
+    @latency.setter
+    def latency(self, latency: float) -> None:
+        self.__latency = latency
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        A copy of the current actual values of all channels (without noise)
+        """
+        with self.__lock:
+            self.__advance_to_now()
+            return self.__values.copy()
+
+    def get_set_point(self, index: int) -> float:
+        self.__simulate_latency()
+        with self.__lock:
+            return float(self.__set_points[index])
+
+    def write_set_point(self, index: int, set_point: float) -> None:
+        self.__simulate_latency()
+        with self.__lock:
+            self.__advance_to_now()
+            self.__set_points[index] = set_point
+
+    def read_actual_value(self, index: int) -> float:
+        self.__simulate_latency()
+        with self.__lock:
+            self.__advance_to_now()
+            value = float(self.__values[index])
+        if self.__noise > 0:
+            value += float(self.__rng.normal(0.0, self.__noise))
+        return value
+
+    def enable_control_loop(self, index: int, enable: bool) -> None:
+        self.__simulate_latency()
+        with self.__lock:
+            self.__advance_to_now()
+            self.__loop_enabled[index] = enable
+            self.__integrals[index] = 0.0
+
+    def is_control_loop_enabled(self, index: int) -> bool:
+        self.__simulate_latency()
+        with self.__lock:
+            return bool(self.__loop_enabled[index])
+
+    def advance(self, steps: int = 1) -> None:
+        """
+        Advances the simulation by `steps` time steps regardless of the elapsed time (e.g. for faster than real time
+        simulations)
+        """
+        with self.__lock:
+            for _ in range(steps):
+                self.__step()
+
+    def __simulate_latency(self) -> None:
+        if self.__latency > 0:
+            time.sleep(self.__latency)
+
+    def __advance_to_now(self) -> None:
+        now = time.monotonic()
+        steps = int((now - self.__last_update) // self.__time_step)
+        for _ in range(steps):
+            self.__step()
+        self.__last_update += steps * self.__time_step
+
+    def __step(self) -> None:
+        dt = self.__time_step
+        enabled = self.__loop_enabled
+
+        # PID with derivative on the measurement (the derivative of the error without set point kicks)
+        errors = self.__set_points - self.__values
+        previous_values = self.__values
+        integrals = self.__integrals + errors * dt
+        outputs = self.__kp * errors + self.__ki * integrals - self.__kd * self.__value_rate
+        clipped = np.clip(outputs, self.__output_min, self.__output_max)
+        # only integrate while the output is not saturated (or the error drives it out of saturation)
+        integrate = (outputs == clipped) | (np.sign(errors) != np.sign(outputs))
+        self.__integrals = np.where(enabled & integrate, integrals, np.where(enabled, self.__integrals, 0.0))
+        self.__outputs = np.where(enabled, clipped, 0.0)
+
+        # FOPDT plant driven by the output from `delay_steps` steps ago
+        history_length = len(self.__output_history)
+        self.__history_head = (self.__history_head + 1) % history_length
+        self.__output_history[self.__history_head] = self.__outputs
+        delayed_outputs = self.__output_history[
+            (self.__history_head - self.__delay_steps) % history_length, self.__channel_indices
+        ]
+        self.__values = self.__values + self.__alpha * (self.__ambient + self.__gain * delayed_outputs - self.__values)
+        self.__value_rate = (self.__values - previous_values) / dt
+
+
+def simulated_channels(channels: Sequence[Tuple[int, str]], **bank_args) -> List[SimulatedControllerChannel]:
+    """
+    Creates a `SimulatedControllerBank` with a channel for each `(index, name)` (the index is ignored) and returns its
+    channels, `bank_args` are passed to the bank (e.g. as the channel factory of a `ControllerSupervisor`)
+    """
+    return SimulatedControllerBank(len(channels), names=[name for _, name in channels], **bank_args).channels
@@ -0,0 +1,429 @@
+"""
+Serving controller devices from several worker processes
+
+A single Python process serves all of its channels and clients on one core because of the GIL. The
+`ControllerSupervisor` spreads the controller devices across a pool of worker processes instead. Each worker runs one
+consolidated `Server` (see `create_consolidated_server`) for its devices on a port of its own. The supervisor starts the
+workers, checks their health periodically, restarts workers that have died or stopped responding with an exponential
+backoff, and shuts all of them down cleanly.
+
+The handles of the controller channels can't be shared between processes, so the workers only get the index and the
+name of each of their channels and create the channels themselves with a `ChannelFactory` (by default
+`lazy_controller_channels`). Each channel therefore belongs to exactly one worker. The devices in the supervising
+process have to be created with `lazy_channels=True`, so that the supervisor knows the index of every channel.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from enum import Enum
+from multiprocessing.connection import Connection
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import uuid4
+
+from .channel_discovery import lazy_controller_channels
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+    from . import ControllerDevice
+
+logger = logging.getLogger(__name__)
+
+ChannelFactory = Callable[[List[Tuple[int, str]]], List[Any]]
+"""Creates the channels for a list of `(index, name)` in a worker process (has to be picklable)"""
+
+
+class WorkerSpec(NamedTuple):
+    """
+    Everything a worker process needs to serve its devices (has to be picklable)
+    """
+
+    name: str
+    host: str
+    port: int
+    devices: List[Tuple[str, List[Tuple[int, str]]]]  # device name -> (index, name) of each of its channels
+    channel_factory: ChannelFactory
+    setup: Optional[Callable[[], None]]  # called first in the worker process (e.g. to open the device bus)
+    server_args: Dict[str, Any]
+    enable_discovery: bool
+    log_level: int
+
+    @property
+    def channel_count(self) -> int:
+        return sum(len(channels) for _, channels in self.devices)
+
+
+class WorkerState(Enum):
+    STARTING = "starting"
+    RUNNING = "running"
+    BACKING_OFF = "backing off"  # waiting to be restarted
+    STOPPED = "stopped"
+
+
+class WorkerStatus(NamedTuple):
+    name: str
+    port: int
+    device_names: List[str]
+    state: WorkerState
+    pid: Optional[int]
+    restarts: int
+
+
+def shard_devices(devices: Sequence[ControllerDevice], worker_count: int) -> List[List[ControllerDevice]]:
+    """
+    Distributes the `devices` across at most `worker_count` workers so that every worker has about the same number of
+    channels (the devices with the most channels are assigned first, each to the worker with the fewest channels)
+    """
+    if worker_count < 1:
+        raise ValueError(f"The number of workers must be positive, got {worker_count}")
+    shards: List[List[ControllerDevice]] = [[] for _ in range(min(worker_count, len(devices)))]
+    channel_counts = [0] * len(shards)
+    for device in sorted(devices, key=lambda device: len(device.controller_channels), reverse=True):
+        i = channel_counts.index(min(channel_counts))
+        shards[i].append(device)
+        channel_counts[i] += len(device.controller_channels)
+    return [shard for shard in shards if shard]
+
+
+def _run_worker(spec: WorkerSpec, connection: Connection) -> None:
+    """
+    The main function of a worker process
+
+    Sends `("started", pid)` or `("error", message)` after the start and answers every `"ping"` with `("pong",
+    healthy)` until `"stop"` is received or the supervisor is gone.
+    """
+    logging.basicConfig(level=spec.log_level, format=f"%(asctime)s:%(levelname)s:{spec.name}:%(name)s:%(message)s")
+    server = None
+    try:
+        if spec.setup is not None:
+            spec.setup()
+        from .channel_table import ChannelTable
+        from .sila.controllers_service.server import Server
+
+        channels = spec.channel_factory([channel for _, channels in spec.devices for channel in channels])
+        table = ChannelTable(((device_name, [name for _, name in channels]) for device_name, channels in spec.devices))
+        server = Server(channels, channel_names=table.names, **spec.server_args)
+        server.start_insecure(spec.host, spec.port, enable_discovery=spec.enable_discovery)
+    except Exception as err:
+        logging.getLogger(__name__).error(f"Worker {spec.name} failed to start", exc_info=True)
+        connection.send(("error", repr(err)))
+        if server is not None:
+            server.stop()
+        return
+
+    connection.send(("started", os.getpid()))
+    try:
+        while True:
+            try:
+                command = connection.recv()
+            except (EOFError, OSError):
+                # the supervisor is gone
+                break
+            if command == "ping":
+                connection.send(("pong", server.controlloopservice.poller.is_running))
+            elif command == "stop":
+                break
+    finally:
+        server.stop()
+
+
+class _Worker:
+    spec: WorkerSpec
+    state: WorkerState
+    process: Optional[BaseProcess]
+    connection: Optional[Connection]
+    pid: Optional[int]
+    restarts: int
+    failures: int  # consecutive failures, determines the backoff
+    started_at: float
+    start_deadline: float  # when a starting worker that has not reported its start yet is considered failed
+    restart_at: float
+
+    def __init__(self, spec: WorkerSpec) -> None:
+        self.spec = spec
+        self.state = WorkerState.STOPPED
+        self.process = None
+        self.connection = None
+        self.pid = None
+        self.restarts = 0
+        self.failures = 0
+        self.started_at = 0.0
+        self.start_deadline = 0.0
+        self.restart_at = 0.0
+
+
+class ControllerSupervisor:
+    """
+    Runs a worker process with a `Server` for each `WorkerSpec` and keeps the workers alive
+
+    The supervisor thread checks the workers every `health_check_interval` seconds: A worker that has exited, that does
+    not answer a ping within `health_check_timeout` seconds or whose channel poller has stopped is killed and restarted
+    after `min_backoff` seconds. The backoff doubles with every consecutive failure up to `max_backoff` and is reset
+    once a worker has been running for `max_backoff` seconds. A restarted worker is not waited for, it is checked on
+    every following pass until it has started or `start_timeout` seconds have passed, so a slow start doesn't delay the
+    supervision of the other workers.
+
+    Every worker keeps the UUID of its server across restarts, so that clients can reconnect to it. If the
+    `server_args` of a spec don't contain a `server_uuid`, a random one is assigned to the worker.
+    """
+
+    __workers: List[_Worker]
+    __context: Any  # multiprocessing context
+    __health_check_interval: float
+    __health_check_timeout: float
+    __start_timeout: float
+    __min_backoff: float
+    __max_backoff: float
+    __stop_event: Event
+    __thread: Optional[Thread]
+
+    def __init__(
+        self,
+        specs: Sequence[WorkerSpec],
+        *,
+        health_check_interval: float = 1.0,
+        health_check_timeout: float = 5.0,
+        start_timeout: float = 60.0,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        ports = [spec.port for spec in specs]
+        if len(set(ports)) != len(ports):
+            raise ValueError(f"Every worker needs a port of its own, got {ports}")
+        self.__workers = [
+            _Worker(
+                spec
+                if spec.server_args.get("server_uuid") is not None
+                else spec._replace(server_args=dict(spec.server_args, server_uuid=uuid4()))
+            )
+            for spec in specs
+        ]
+        # workers are spawned instead of forked, forking a process that already runs gRPC threads is not safe
+        self.__context = multiprocessing.get_context("spawn")
+        self.__health_check_interval = health_check_interval
+        self.__health_check_timeout = health_check_timeout
+        self.__start_timeout = start_timeout
+        self.__min_backoff = min_backoff
+        self.__max_backoff = max_backoff
+        self.__stop_event = Event()
+        self.__thread = None
+
+    @property
+    def specs(self) -> List[WorkerSpec]:
+        return [worker.spec for worker in self.__workers]
+
+    def status(self) -> List[WorkerStatus]:
+        return [
+            WorkerStatus(
+                worker.spec.name,
+                worker.spec.port,
+                [device_name for device_name, _ in worker.spec.devices],
+                worker.state,
+                worker.pid,
+                worker.restarts,
+            )
+            for worker in self.__workers
+        ]
+
+    def start(self) -> None:
+        """
+        Starts all workers, waits until they are running (or have failed to start) and starts supervising them
+        """
+        if self.__thread is not None:
+            return
+        self.__stop_event.clear()
+        for worker in self.__workers:
+            self.__spawn(worker)
+        for worker in self.__workers:
+            self.__check_started(worker, max(0.0, worker.start_deadline - time.monotonic()))
+        self.__thread = Thread(target=self.__supervise, name=self.__class__.__name__, daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Stops supervising and shuts all workers down, workers that don't exit within `timeout` seconds are killed
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        for worker in self.__workers:
+            if worker.connection is not None:
+                try:
+                    worker.connection.send("stop")
+                except (OSError, ValueError):
+                    pass
+        deadline = time.monotonic() + timeout
+        for worker in self.__workers:
+            self.__terminate(worker, max(0.0, deadline - time.monotonic()))
+            worker.state = WorkerState.STOPPED
+        logger.info("Stopped all workers")
+
+    def __spawn(self, worker: _Worker) -> None:
+        parent_connection, child_connection = self.__context.Pipe()
+        worker.process = self.__context.Process(
+            target=_run_worker, args=(worker.spec, child_connection), name=worker.spec.name, daemon=True
+        )
+        worker.process.start()
+        child_connection.close()
+        worker.connection = parent_connection
+        worker.pid = worker.process.pid
+        worker.state = WorkerState.STARTING
+        worker.started_at = time.monotonic()
+        worker.start_deadline = worker.started_at + self.__start_timeout
+        logger.info(
+            f"Started worker {worker.spec.name} (pid {worker.pid}) for {worker.spec.channel_count} channel(s) on "
+            f"port {worker.spec.port}"
+        )
+
+    def __check_started(self, worker: _Worker, timeout: float) -> None:
+        """
+        Waits up to `timeout` seconds for a starting worker to report its start, fails it if it has reported an error,
+        has exited or has passed its start deadline
+        """
+        try:
+            message = worker.connection.recv() if worker.connection.poll(timeout) else None
+        except (EOFError, OSError):
+            message = ("error", "exited")
+        if message is None:
+            if time.monotonic() >= worker.start_deadline:
+                self.__fail(worker, f"failed to start (no response within {self.__start_timeout:.1f} s)")
+        elif message[0] == "started":
+            worker.state = WorkerState.RUNNING
+            worker.started_at = time.monotonic()
+            logger.info(f"Worker {worker.spec.name} (pid {worker.pid}) is running")
+        else:
+            self.__fail(worker, f"failed to start ({message[1]})")
+
+    def __terminate(self, worker: _Worker, timeout: float) -> None:
+        if worker.process is not None:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                logger.warning(f"Killing worker {worker.spec.name} (pid {worker.pid})")
+                worker.process.kill()
+                worker.process.join()
+            worker.process = None
+        if worker.connection is not None:
+            worker.connection.close()
+            worker.connection = None
+        worker.pid = None
+
+    def __fail(self, worker: _Worker, reason: str) -> None:
+        if time.monotonic() - worker.started_at >= self.__max_backoff and worker.state is WorkerState.RUNNING:
+            # it has been running long enough, so this is a new failure, not a crash loop
+            worker.failures = 0
+        backoff = min(self.__max_backoff, self.__min_backoff * 2**worker.failures)
+        worker.failures += 1
+        logger.error(f"Worker {worker.spec.name} {reason}, restarting it in {backoff:.1f} s")
+        # a worker that has failed to start is exiting anyway, a hanging one is killed after a second
+        self.__terminate(worker, 1.0)
+        worker.state = WorkerState.BACKING_OFF
+        worker.restart_at = time.monotonic() + backoff
+
+    def __supervise(self) -> None:
+        while not self.__stop_event.wait(self.__health_check_interval):
+            now = time.monotonic()
+            pinged: List[_Worker] = []
+            for worker in self.__workers:
+                if worker.state is WorkerState.BACKING_OFF and now >= worker.restart_at:
+                    worker.restarts += 1
+                    # its start is checked by the following passes
+                    self.__spawn(worker)
+                elif worker.state is WorkerState.STARTING:
+                    self.__check_started(worker, 0)
+                elif worker.state is WorkerState.RUNNING:
+                    if not worker.process.is_alive():
+                        self.__fail(worker, f"exited with code {worker.process.exitcode}")
+                        continue
+                    try:
+                        worker.connection.send("ping")
+                        pinged.append(worker)
+                    except (OSError, ValueError):
+                        self.__fail(worker, "is not reachable")
+
+            # all workers are pinged first and answer concurrently
+            deadline = time.monotonic() + self.__health_check_timeout
+            for worker in pinged:
+                try:
+                    timeout = max(0.0, deadline - time.monotonic())
+                    message = worker.connection.recv() if worker.connection.poll(timeout) else None
+                except (EOFError, OSError):
+                    message = None
+                if message is None:
+                    self.__fail(worker, "did not answer the health check")
+                elif not message[1]:
+                    self.__fail(worker, "is unhealthy (the channel poller is not running)")
+
+
+def create_supervisor(
+    devices: Sequence[ControllerDevice],
+    worker_count: int,
+    base_port: int,
+    *,
+    host: str = "127.0.0.1",
+    channel_factory: ChannelFactory = lazy_controller_channels,
+    setup: Optional[Callable[[], None]] = None,
+    enable_discovery: bool = True,
+    log_level: Optional[int] = None,
+    supervisor_args: Optional[Dict[str, Any]] = None,
+    **server_args,
+) -> ControllerSupervisor:
+    """
+    Creates a `ControllerSupervisor` that serves the `devices` from up to `worker_count` worker processes
+
+    Parameters
+    ----------
+    devices: Sequence[ControllerDevice]
+        The devices to serve, their channels need an `index` (e.g. `LazyControllerChannel`s)
+    worker_count: int
+        The maximum number of worker processes (usually the number of cores)
+    base_port: int
+        The port of the first worker, the other workers use the following ports
+    host: str (default: "127.0.0.1")
+        The address the servers of the workers listen on
+    channel_factory: ChannelFactory (default: `lazy_controller_channels`)
+        Creates the channels from their `(index, name)` in each worker
+    setup: Callable[[], None] (optional)
+        Called first in every worker process (e.g. to open the device bus), has to be picklable
+    enable_discovery: bool (default: True)
+        Whether the servers of the workers announce themselves with SiLA Server Discovery
+    log_level: int (optional)
+        The log level of the workers (default: the log level of this package's logger)
+    supervisor_args: Dict[str, Any] (optional)
+        Additional arguments for the `ControllerSupervisor` (e.g. `health_check_interval`)
+    **server_args
+        Additional arguments to pass to the `Server` of each worker (e.g. `poll_interval`), have to be picklable
+    """
+    specs = []
+    for i, shard in enumerate(shard_devices(devices, worker_count)):
+        shard_layout = []
+        for device in shard:
+            channels = []
+            for channel in device.controller_channels:
+                index = getattr(channel, "index", None)
+                if index is None:
+                    raise ValueError(
+                        f"Channel {channel.get_name()} of device {device.name} has no index, create the devices with "
+                        f"`lazy_channels=True`"
+                    )
+                channels.append((index, channel.get_name()))
+            shard_layout.append((device.name, channels))
+        specs.append(
+            WorkerSpec(
+                name=f"ControllerWorker{i}",
+                host=host,
+                port=base_port + i,
+                devices=shard_layout,
+                channel_factory=channel_factory,
+                setup=setup,
+                server_args=dict(server_args),
+                enable_discovery=enable_discovery,
+                log_level=log_level if log_level is not None else logger.getEffectiveLevel(),
+            )
+        )
+    return ControllerSupervisor(specs, **(supervisor_args or {}))